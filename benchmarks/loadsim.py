@@ -0,0 +1,360 @@
+"""Headless load simulation of the bot's button handlers.
+
+Drives the real HostView / ClaimButton / CardButton / CardToggle callbacks
+with local stand-ins for Discord's Interaction, Message, Channel and Guild,
+so the bot can be measured without a live guild:
+
+    python -m benchmarks.loadsim --games 20 --players 50 --duration 30
+
+Results (handler latency percentiles, lock wait, storage I/O time, draws/sec)
+are printed and saved as JSON so runs can be compared for regressions.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import discord
+
+from utils import config
+
+_ids = itertools.count(10**17)
+# Every message sent, so the bot can look up messages it only knows by id
+_messages: dict[int, "FakeMessage"] = {}
+
+
+class FakeUser:
+    def __init__(self, user_id: int | None = None):
+        self.id = user_id or next(_ids)
+        self.display_name = f"user{self.id % 100000}"
+        self.mention = f"<@{self.id}>"
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id = next(_ids)
+        self.members: dict[int, FakeUser] = {}
+
+    def get_member(self, user_id: int) -> FakeUser | None:
+        return self.members.get(user_id)
+
+
+class FakeInteractionMetadata:
+    def __init__(self, user: FakeUser):
+        self.user = user
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", embeds=None, author: FakeUser | None = None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.guild = channel.guild
+        self.embeds = list(embeds or [])
+        # The user whose slash command created the message (lobbies only)
+        self.interaction = FakeInteractionMetadata(author) if author else None
+        self.deleted = False
+        _messages[self.id] = self
+
+    async def edit(self, **fields):
+        await self.channel.api_call("edit")
+        if random.random() < self.channel.rate_limit_prob:
+            # What discord.py raises for a 429 longer than max_ratelimit_timeout
+            raise discord.RateLimited(0.05)
+        if self.deleted:
+            raise discord.NotFound(_FakeResponse(404), "Unknown Message")
+        if "embed" in fields:
+            self.embeds = [fields["embed"]]
+
+    async def delete(self):
+        await self.channel.api_call("delete")
+        self.deleted = True
+
+
+class _FakeResponse:
+    """Just enough of an aiohttp response for discord.HTTPException."""
+
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = "Fake"
+
+
+class FakeChannel:
+    def __init__(self, guild: FakeGuild, stats: "Stats", latency: float, rate_limit_prob: float = 0.0):
+        self.id = next(_ids)
+        self.guild = guild
+        self.stats = stats
+        self.latency = latency
+        self.rate_limit_prob = rate_limit_prob
+
+    async def api_call(self, kind: str):
+        self.stats.api_calls[kind] = self.stats.api_calls.get(kind, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def send(self, content=None, *, embed=None, view=None, **kwargs):
+        await self.api_call("send")
+        return FakeMessage(self, [embed] if embed else [])
+
+
+class FakeCallbackResponse:
+    def __init__(self, resource: FakeMessage | None):
+        self.resource = resource
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self.done = False
+
+    async def send_message(self, content=None, *, embed=None, view=None, ephemeral=False, **kwargs):
+        self.done = True
+        await self.interaction.channel.api_call("respond")
+        if embed is not None and not ephemeral:
+            # Slash command replies become the lobby message
+            self.interaction.sent = FakeMessage(
+                self.interaction.channel, [embed], author=self.interaction.user
+            )
+        return FakeCallbackResponse(self.interaction.sent)
+
+    async def defer(self, **kwargs):
+        self.done = True
+        await self.interaction.channel.api_call("respond")
+
+    async def edit_message(self, **kwargs):
+        self.done = True
+        await self.interaction.channel.api_call("respond")
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, *args, **kwargs):
+        await self.interaction.channel.api_call("followup")
+
+
+class FakeInteraction:
+    def __init__(self, user: FakeUser, channel: FakeChannel, message: FakeMessage | None = None, data=None):
+        self.user = user
+        self.channel = channel
+        self.guild = channel.guild
+        self.guild_id = channel.guild.id
+        self.message = message
+        self.data = data or {}
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+        self.sent: FakeMessage | None = None
+
+    async def edit_original_response(self, **kwargs):
+        await self.channel.api_call("followup")
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.api_calls: dict[str, int] = {}
+        self.draws = 0
+        self.games_won = 0
+
+    def record(self, handler: str, seconds: float):
+        self.latencies.setdefault(handler, []).append(seconds)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def timed(stats: Stats, handler: str, coro):
+    start = time.perf_counter()
+    await coro
+    stats.record(handler, time.perf_counter() - start)
+
+
+async def run_game(main, stats: Stats, args, guild: FakeGuild, deadline: float):
+    channels = [
+        FakeChannel(guild, stats, args.api_latency, args.rate_limit_prob)
+        for _ in range(args.channels)
+    ]
+    channel = channels[0]
+    host = FakeUser()
+    players = [FakeUser() for _ in range(args.players - 1)]
+    for user in [host, *players]:
+        guild.members[user.id] = user
+
+    # Host the game and fill the lobby
+    interaction = FakeInteraction(host, channel)
+    await timed(
+        stats,
+        "bingo",
+        main.bingo_host.callback(interaction, args.players, args.draw_interval),
+    )
+    host_id = str(host.id)
+    lobby = interaction.sent
+    # A tournament opens a lobby in each further channel
+    for extra in channels[1:]:
+        await timed(stats, "tournament", main.tournament.callback(FakeInteraction(host, extra)))
+    lobbies = [_messages[message_id] for _, message_id in main.store.get(host_id).lobbies]
+
+    view = main.HostView()
+    homes = {}
+    for i, user in enumerate(players):
+        joined_via = lobbies[(i + 1) % len(lobbies)]
+        homes[user.id] = joined_via.channel
+        await timed(
+            stats, "join", view.join_game.callback(FakeInteraction(user, joined_via.channel, joined_via))
+        )
+
+    await timed(stats, "start", view.start_game.callback(FakeInteraction(host, channel, lobby)))
+    board = main.boards.get(host_id)
+    if board is None:
+        return
+    copies = {m.channel.id: m for m in board.messages()}
+
+    async def play(user: FakeUser):
+        player_id = str(user.id)
+        channel = homes.get(user.id, channels[0])
+        message = copies[channel.id]
+        while time.monotonic() < deadline and host_id in main.store:
+            await asyncio.sleep(random.expovariate(args.click_rate))
+            game = main.store.get(host_id)
+            if game is None:
+                break
+            roll = random.random()
+            if roll < 0.6:
+                card = game.cards[player_id].card
+                number = random.choice(main.bingo.mask_numbers(card))
+                item = main.CardToggle(host_id, player_id, number=number)
+                coro = item.callback(FakeInteraction(user, channel, message))
+                await timed(stats, "mark", coro)
+            elif roll < 0.9:
+                coro = main.ClaimButton(host_id).callback(FakeInteraction(user, channel, message))
+                await timed(stats, "claim", coro)
+            else:
+                coro = main.CardButton(host_id).callback(FakeInteraction(user, channel, message))
+                await timed(stats, "card", coro)
+
+    await asyncio.gather(*(play(user) for user in [host, *players]))
+    if host_id not in main.store:
+        stats.games_won += 1
+
+
+def instrument(main, stats: Stats):
+    """Counts draws by wrapping the scheduler's tick."""
+    draw_tick = main.scheduler.tick
+
+    async def counted_tick(host_id: str) -> bool:
+        stats.draws += 1
+        return await draw_tick(host_id)
+
+    main.scheduler.tick = counted_tick
+
+
+async def simulate(args) -> dict:
+    import main
+
+    stats = Stats()
+    instrument(main, stats)
+    # Players click as fast as the scenario says instead of being throttled
+    if not args.respect_cooldown:
+        main.rate_limiter.default = (10**9, 1e-9)
+        main.rate_limiter.limits = {}
+    main.edit_queue.min_interval = args.edit_interval
+    main.partial_message = lambda channel_id, message_id: _messages[message_id]
+
+    main.store.start()
+    main.scheduler.start()
+    started = time.monotonic()
+    deadline = started + args.duration
+    guilds = [FakeGuild() for _ in range(max(1, args.games // 10))]
+    await asyncio.gather(
+        *(run_game(main, stats, args, guilds[i % len(guilds)], deadline) for i in range(args.games))
+    )
+    elapsed = time.monotonic() - started
+    await main.scheduler.close()
+    await main.store.close()
+    main.card_renderer.close()
+
+    return {
+        "scenario": {
+            "games": args.games,
+            "players": args.players,
+            "channels": args.channels,
+            "click_rate": args.click_rate,
+            "draw_interval": args.draw_interval,
+            "duration": args.duration,
+            "api_latency": args.api_latency,
+            "rate_limit_prob": args.rate_limit_prob,
+        },
+        "elapsed": elapsed,
+        "handlers": {
+            name: {
+                "count": len(values),
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+                "max_ms": max(values) * 1000,
+            }
+            for name, values in sorted(stats.latencies.items())
+        },
+        "locks": main.locks.stats(),
+        "storage": {
+            "writes": main.store.writes,
+            "seconds": main.store.write_seconds,
+            "bytes": main.store.write_bytes,
+        },
+        "draws": stats.draws,
+        "draws_per_sec": stats.draws / elapsed if elapsed else 0.0,
+        "games_won": stats.games_won,
+        "api_calls": stats.api_calls,
+        "edit_queue": main.edit_queue.stats(),
+        "rate_limiter": main.rate_limiter.stats(),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10, help="concurrent games")
+    parser.add_argument("--players", type=int, default=20, help="players per game, host included")
+    parser.add_argument("--channels", type=int, default=1, help="channels per game; more than one runs each game as a tournament")
+    parser.add_argument("--click-rate", type=float, default=0.5, help="clicks per second per player")
+    parser.add_argument("--draw-interval", type=float, default=0.2, help="seconds between draws")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="simulated Discord API latency in seconds")
+    parser.add_argument("--rate-limit-prob", type=float, default=0.0, help="chance that a message edit is answered with a 429")
+    parser.add_argument("--edit-interval", type=float, default=0.0, help="minimum seconds between edits per channel")
+    parser.add_argument("--respect-cooldown", action="store_true", help="keep the configured button rate limits")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default="bench_results.json", help="where to save the JSON results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    # Keep the simulation's state away from the real data files
+    workdir = tempfile.mkdtemp(prefix="bingo-loadsim-")
+    config.GAME_DATA_PATH = os.path.join(workdir, "game_data.json")
+    config.LEADERBOARD_PATH = os.path.join(workdir, "leaderboard.json")
+    config.DATABASE_PATH = os.path.join(workdir, "bingo.db")
+    config.JOURNAL_PATH = os.path.join(workdir, "journal.log")
+    config.DRAW_JITTER = 0
+
+    results = asyncio.run(simulate(args))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    json.dump(results, sys.stdout, indent=2)
+    print(f"\nSaved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
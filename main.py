@@ -1,217 +1,340 @@
 import discord
 import asyncio
-import random
-import time
+import hashlib
+import io
+import json
+
+from typing import Literal
 
 from discord import app_commands
 from discord.ext import commands
-from datetime import datetime
-
-from utils import config, json_util, bingo
-
-# Global lock to prevent concurrent file access
-game_data_lock = asyncio.Lock()
-
-
-# Helper to build a rich Bingo numbers embed
-def make_bingo_embed(
-    host_name: str, drawn: list[int], new: int | None
-) -> discord.Embed:
-    """Constructs an embed showing Bingo columns, progress, and the most recent number."""
-    # Distribute drawn numbers into B-I-N-G-O columns
-    columns = {"B": [], "I": [], "N": [], "G": [], "O": []}
-    for n in drawn:
-        if n <= 15:
-            columns["B"].append(str(n))
-        elif n <= 30:
-            columns["I"].append(str(n))
-        elif n <= 45:
-            columns["N"].append(str(n))
-        elif n <= 60:
-            columns["G"].append(str(n))
-        else:
-            columns["O"].append(str(n))
 
-    embed = discord.Embed(
-        title=f"🎱 Bingo Numbers — Hosted by {host_name}",
-        color=discord.Colour.green(),
-        timestamp=datetime.utcnow(),
-    )
-    # Show the most recently called number
-    if new is not None:
-        embed.add_field(name="🎉 Just Called", value=f"**{new}**", inline=False)
-    else:
-        embed.add_field(name="🎉 Just Called", value="—", inline=False)
+from utils import config, bingo, json_util, sharding, sqlite_util
+from utils.board import Board
+from utils.card_image import CardRenderer
+from utils.journal import Journal
+from utils.edit_queue import EditQueue
+from utils.locks import LockRegistry
+from utils.metrics import Metrics
+from utils.models import Game
+from utils.names import NameCache
+from utils.profiler import Profiler
+from utils.ratelimit import RateLimiter
+from utils.roster import Roster
+from utils.scheduler import DrawScheduler
+from utils.store import GameStore
+
+# Handler latencies and operational counters, served as Prometheus text
+metrics = Metrics()
+
+# One lock per game, so independent games never wait on each other
+locks = LockRegistry()
+
+# Under the sharding supervisor this process only sees the guilds of its own
+# shards, so it keeps their games in its own partition of the data files
+shards = sharding.worker_shards()
+game_data_path = config.GAME_DATA_PATH
+journal_path = config.JOURNAL_PATH
+database_path = config.DATABASE_PATH
+if shards is not None:
+    partition = sharding.partition_name(shards[0])
+    game_data_path = sharding.partition_path(game_data_path, partition)
+    journal_path = sharding.partition_path(journal_path, partition)
+    database_path = sharding.partition_path(database_path, partition)
+
+# Games and the leaderboard live either in JSON files or in SQLite; the
+# leaderboard is shared by every partition
+if config.STORAGE_BACKEND == "sqlite":
+    backend = sqlite_util.SqliteBackend(database_path, config.DATABASE_PATH)
+else:
+    backend = json_util.JsonBackend(game_data_path, config.LEADERBOARD_PATH)
+
+# All games live in memory; every change is journaled and snapshots are
+# flushed to disk in the background
+store = GameStore(
+    backend,
+    config.GAME_DATA_FLUSH_INTERVAL,
+    journal=Journal(journal_path),
+    compact_bytes=config.JOURNAL_COMPACT_BYTES,
+)
+
+# Board and lobby edits are coalesced and paced per channel
+edit_queue = EditQueue(min_interval=config.EDIT_MIN_INTERVAL)
+edit_queue.watch_http_log()
+
+# Button clicks are rate limited per user and action
+rate_limiter = RateLimiter(
+    (1, config.BUTTON_COOLDOWN), config.RATE_LIMITS, ttl=config.RATE_LIMIT_TTL
+)
+
+# Card images are rendered in worker processes and cached
+card_renderer = CardRenderer(config.CARD_RENDER_WORKERS, config.CARD_IMAGE_CACHE_SIZE)
+
+# On-demand captures of the event loop, started with /profile
+profiler = Profiler(config.PROFILE_DIR, config.PROFILE_SAMPLE_INTERVAL)
 
-    # Add each Bingo column
-    for letter in "BINGO":
-        nums = " ".join(sorted(columns[letter])) or "—"
-        embed.add_field(
-            name=f"{letter} ({len(columns[letter])})", value=nums, inline=False
+# Display names of players, since members aren't cached
+names = NameCache(config.NAME_CACHE_SIZE)
+
+# Number board of every running game, keyed by host id
+boards: dict[str, Board] = {}
+
+# Roster of every open lobby that has seen a join or leave, keyed by host id
+lobbies: dict[str, Roster] = {}
+
+
+async def delete_game(host_id: str) -> Game | None:
+    """Removes a game from the store and drops its lock. Callers should hold the game's lock."""
+    async with locks.registry():
+        game = store.delete(host_id)
+        locks.discard(host_id)
+    scheduler.cancel(host_id)
+    boards.pop(host_id, None)
+    roster = lobbies.pop(host_id, None)
+    if roster is not None:
+        roster.cancel()
+    return game
+
+
+def partial_message(channel_id: int, message_id: int) -> discord.PartialMessage:
+    """A message the bot knows only by id, e.g. in another channel of a tournament."""
+    return bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+
+
+def publish_lobby(roster: Roster) -> None:
+    # Rendered once, however many channels the lobby was opened in
+    embed = roster.embed()
+    for message in roster.messages.values():
+        edit_queue.edit(message, embed=embed)
+
+
+def update_lobby(host_id: str, message: discord.Message, game: Game) -> Roster:
+    """The lobby's roster, with an edit of its messages scheduled. Callers should hold the game's lock."""
+    roster = lobbies.get(host_id)
+    if roster is None:
+        # First change since the lobby was created (or since a restart)
+        roster = lobbies[host_id] = Roster.from_message(
+            message, game.players, config.LOBBY_ROSTER_FIELDS
         )
+    roster.attach(message)
+    for channel_id, message_id in game.lobbies:
+        if message_id not in roster.messages:
+            roster.attach(partial_message(channel_id, message_id))
+    roster.schedule(config.LOBBY_EDIT_DELAY, publish_lobby)
+    return roster
 
-    # Progress bar footer
-    total = 75
-    called = len(drawn)
-    filled = int(called / total * 10)
-    bar = "█" * filled + "░" * (10 - filled)
-    embed.set_footer(text=f"{called}/{total} numbers drawn • {bar}")
-    return embed
 
+def lobby_host(message: discord.Message) -> str | None:
+    """Host id of a lobby message; lobbies opened with /tournament aren't a reply to the host."""
+    host_id = store.host_of_message(message.id)
+    if host_id is None and message.interaction is not None:
+        host_id = str(message.interaction.user.id)
+    return host_id
 
-class CardView(discord.ui.View):
-    """Interactive 5×5 Bingo card for a single player."""
 
-    def __init__(self, host_id: str, player_id: str):
-        super().__init__(timeout=None)
+def game_of(host: str | None, interaction: discord.Interaction) -> str | None:
+    """Host id a component belongs to; older components only carry it through their message."""
+    if host is not None:
+        return host
+    return store.host_of_message(interaction.message.id) if interaction.message else None
+
+
+class CardToggle(
+    discord.ui.DynamicItem[discord.ui.Select],
+    template=r"bingo_card:(?P<host>[0-9]+):(?P<player>[0-9]+)(?::(?P<num>[0-9]+))?",
+):
+    """Mark menu of a player's card, routed by custom_id so no View is kept per card.
+
+    Also answers the per-number buttons of cards sent before cards were images.
+    """
+
+    def __init__(
+        self,
+        host_id: str,
+        player_id: str,
+        item: discord.ui.Item | None = None,
+        number: int | None = None,
+    ):
+        if item is None:
+            item = discord.ui.Select(
+                placeholder="Mark or unmark a number…",
+                custom_id=f"bingo_card:{host_id}:{player_id}",
+            )
+        super().__init__(item)
         self.host_id = host_id
         self.player_id = player_id
+        self.number = number
+
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: discord.ui.Item, match
+    ):
+        number = int(match["num"]) if match["num"] else None
+        return cls(match["host"], match["player"], item, number)
 
-        # Load the player's card and marks
-        game = json_util.load_game_data()[host_id]
-        card_numbers = sorted(game[player_id]["card"])
-        self.marks = set(game[player_id].get("marks", []))
-
-        # Build a 5×5 grid mapping (row,col) → number (skip center)
-        grid: list[list[int | None]] = [[None] * 5 for _ in range(5)]
-        positions = [
-            (r, c) for r in range(5) for c in range(5) if not (r == 2 and c == 2)
-        ]
-        for (r, c), num in zip(positions, card_numbers):
-            grid[r][c] = num
-
-        # Add a button for each cell
-        for r in range(5):
-            for c in range(5):
-                if r == 2 and c == 2:
-                    # Free space
-                    btn = discord.ui.Button(
-                        label="by @behindsecurity",
-                        style=discord.ButtonStyle.success,
-                        disabled=True,
-                        row=r,
-                    )
-                else:
-                    num = grid[r][c]
-                    marked = num in self.marks
-                    btn = discord.ui.Button(
-                        label=str(num),
-                        style=(
-                            discord.ButtonStyle.success
-                            if marked
-                            else discord.ButtonStyle.secondary
-                        ),
-                        custom_id=f"bingo_card:{host_id}:{player_id}:{num}",
-                        row=r,
-                    )
-                    # every dynamic button uses the same callback
-                    btn.callback = self.toggle_mark
-                self.add_item(btn)
-
-    async def toggle_mark(self, interaction: discord.Interaction):
+    @metrics.timed("mark")
+    async def callback(self, interaction: discord.Interaction):
         # Only the rightful owner may click
         if str(interaction.user.id) != self.player_id:
             return await interaction.response.send_message(
                 "This isn’t your card!", ephemeral=True
             )
 
-        # Parse which number was clicked
-        _, host, player, num_s = interaction.data["custom_id"].split(":")
-        number = int(num_s)
-
-        # Toggle in-memory
-        if number in self.marks:
-            self.marks.remove(number)
-        else:
-            self.marks.add(number)
-
-        # Persist back to disk
-        async with game_data_lock:
-            data = json_util.load_game_data()
-            data[host][player]["marks"] = list(self.marks)
-            json_util.save_game_data(data)
-
-        # Update the button’s color
-        for btn in self.children:
-            if getattr(btn, "custom_id", None) == interaction.data["custom_id"]:
-                btn.style = (
-                    discord.ButtonStyle.success
-                    if number in self.marks
-                    else discord.ButtonStyle.secondary
+        number = self.number or int(interaction.data["values"][0])
+        async with locks.game(self.host_id):
+            game = store.get(self.host_id)
+            player = game.cards.get(self.player_id) if game else None
+            if player is None:
+                return await interaction.response.send_message(
+                    "This game is over.", ephemeral=True
                 )
-                break
+            store.set_mark(
+                self.host_id, self.player_id, number, not player.marks >> (number - 1) & 1
+            )
+            card, marks = player.card, player.marks
+
+        # Rendering happens off the event loop, so acknowledge the click first
+        await interaction.response.defer()
+        embed, file, view = await card_message(self.host_id, self.player_id, card, marks)
+        await interaction.edit_original_response(
+            content=None, embed=embed, attachments=[file], view=view
+        )
 
-        # Re-render the view
-        await interaction.response.edit_message(view=self)
 
+async def card_message(
+    host_id: str, player_id: str, card: int, marks: int
+) -> tuple[discord.Embed, discord.File, discord.ui.View]:
+    """Builds the embed, image and mark menu of a player's card."""
+    png = await card_renderer.render(card, marks)
+    embed = discord.Embed(
+        title="🃏 Your Bingo card",
+        description="Pick a number below to mark or unmark it. (**green numbers does not mean you actually scored, just that you marked them on your card**)",
+        colour=discord.Colour.green(),
+    )
+    embed.set_image(url="attachment://card.png")
+    file = discord.File(io.BytesIO(png), filename="card.png")
 
-class BingoView(discord.ui.View):
-    """View for player interactions during a Bingo game."""
+    toggle = CardToggle(host_id, player_id)
+    toggle.item.options = [
+        discord.SelectOption(
+            label=str(num),
+            value=str(num),
+            emoji="✅" if marks >> (num - 1) & 1 else None,
+        )
+        for num in bingo.mask_numbers(card)
+    ]
+    view = discord.ui.View(timeout=None)
+    view.add_item(toggle)
+    return embed, file, view
 
-    def __init__(self, host_id: str, message: discord.Message):
-        super().__init__(timeout=None)
+
+class ClaimButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"bingo_button(?::(?P<host>[0-9]+))?",
+):
+    """Claim Bingo button of a running game."""
+
+    def __init__(self, host_id: str | None, item: discord.ui.Item | None = None):
+        if item is None:
+            item = discord.ui.Button(
+                label="Claim Bingo",
+                style=discord.ButtonStyle.success,
+                custom_id=f"bingo_button:{host_id}",
+                emoji="🎉",
+            )
+        super().__init__(item)
         self.host_id = host_id
-        self.message = message
-        self._last_click: dict[int, float] = {}
-
-    async def _check_cooldown(self, user: discord.User) -> float | None:
-        now = time.time()
-        last = self._last_click.get(user.id, 0)
-        delay = config.BUTTON_COOLDOWN
-        if now - last < delay:
-            return delay - (now - last)
-        self._last_click[user.id] = now
-        return None
 
-    @discord.ui.button(
-        label="Claim Bingo",
-        style=discord.ButtonStyle.success,
-        custom_id="bingo_button",
-        emoji="🎉",
-    )
-    async def bingo_check(
-        self, interaction: discord.Interaction, button: discord.ui.Button
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: discord.ui.Item, match
     ):
-        retry = await self._check_cooldown(interaction.user)
+        return cls(game_of(match["host"], interaction), item)
+
+    @metrics.timed("claim")
+    async def callback(self, interaction: discord.Interaction):
+        retry = rate_limiter.check(interaction.user.id, "claim")
         if retry:
             return await interaction.response.send_message(
                 f"Slow down! Try again in {retry:.1f}s.", ephemeral=True
             )
 
-        async with game_data_lock:
-            data = json_util.load_game_data()
-            if str(interaction.user.id) not in data.get(self.host_id, {}).get(
-                "players", []
-            ):
-                return await interaction.response.send_message(
-                    "You're not part of this game.", ephemeral=True
-                )
-            card_numbers = set(data[self.host_id][str(interaction.user.id)]["card"])
-            drawn = set(data[self.host_id]["numbers_drawn"])
+        host_id = self.host_id
+        player_id = str(interaction.user.id)
+        # Draws replace the snapshot instead of changing it, so reading it
+        # needs no lock; spammed claims never queue behind draws or marks
+        snapshot = store.snapshot(host_id)
+        if snapshot is None or player_id not in snapshot.players:
+            return await interaction.response.send_message(
+                "You're not part of this game.", ephemeral=True
+            )
+        if player_id not in snapshot.winners:
+            return await interaction.response.send_message(
+                "Not quite yet. Keep trying!", ephemeral=True
+            )
 
-        if card_numbers.issubset(drawn):
+        # Only real winners get here; the lock lets just one of them through
+        async with locks.game(host_id):
+            game = store.get(host_id)
+            won = game is not None and game.winner is None
+            if won:
+                store.set_winner(host_id, player_id)
+                # Anyone can replay the draws with python -m utils.bingo <seed> <draws>
+                audit = f"-# Seed {game.seed} • won on draw {game.draws}"
+                if game.legacy_draws:
+                    # Numbers drawn before the game was seeded come first
+                    audit += f" • --legacy {','.join(map(str, game.legacy_draws))}"
+                board = boards.get(host_id)
+                messages = board.messages() if board else [interaction.message]
+
+        if won:
             await interaction.response.send_message(
                 "Congratulations! You got Bingo! 🎉", ephemeral=True
             )
-            await interaction.channel.send(
-                f":tada: {interaction.user.mention} has won the Bingo game! :tada:"
+            # Every channel of a tournament hears about the winner at once
+            announcement = f":tada: {interaction.user.mention} has won the Bingo game! :tada:\n{audit}"
+            await asyncio.gather(
+                *(edit_queue.send(m.channel, announcement) for m in messages),
+                return_exceptions=True,
             )
-            await self.end_game()
+            await end_game(host_id, messages)
+            # Last, so a leaderboard failure can't leave the game stuck
+            try:
+                await asyncio.to_thread(backend.record_win, player_id)
+            except Exception as e:
+                print(f"Failed to record the win of {player_id}: {e}")
         else:
             await interaction.response.send_message(
-                "Not quite yet. Keep trying!", ephemeral=True
+                "Someone else claimed this Bingo first!", ephemeral=True
             )
 
-    @discord.ui.button(
-        label="My Card",
-        style=discord.ButtonStyle.primary,
-        custom_id="card_button",
-        emoji="🃏",
-    )
-    async def send_card(
-        self, interaction: discord.Interaction, button: discord.ui.Button
+
+class CardButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"card_button(?::(?P<host>[0-9]+))?",
+):
+    """My Card button of a running game."""
+
+    def __init__(self, host_id: str | None, item: discord.ui.Item | None = None):
+        if item is None:
+            item = discord.ui.Button(
+                label="My Card",
+                style=discord.ButtonStyle.primary,
+                custom_id=f"card_button:{host_id}",
+                emoji="🃏",
+            )
+        super().__init__(item)
+        self.host_id = host_id
+
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: discord.ui.Item, match
     ):
-        retry = await self._check_cooldown(interaction.user)
+        return cls(game_of(match["host"], interaction), item)
+
+    @metrics.timed("card")
+    async def callback(self, interaction: discord.Interaction):
+        retry = rate_limiter.check(interaction.user.id, "card")
         if retry:
             return await interaction.response.send_message(
                 f"Slow down! Try again in {retry:.1f}s.", ephemeral=True
@@ -219,54 +342,52 @@ class BingoView(discord.ui.View):
 
         host = self.host_id
         player = str(interaction.user.id)
-        async with game_data_lock:
-            data = json_util.load_game_data()
-            game = data.get(host, {})
-            if player not in game.get("players", []):
+        async with locks.game(host):
+            game = store.get(host)
+            record = game.cards.get(player) if game else None
+            if record is None:
                 return await interaction.response.send_message(
                     "You're not part of this game.", ephemeral=True
                 )
+            card, marks = record.card, record.marks
 
-        # Build and send the interactive card
-        card_view = CardView(host, player)
-        await interaction.response.send_message(
-            "Here’s your interactive Bingo card—click to mark numbers! (**green numbers does not mean you actually scored, just that you marked them on your card**)",
-            view=card_view,
-            ephemeral=True,
+        # Build and send the card image with its controls
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        embed, file, view = await card_message(host, player, card, marks)
+        await interaction.followup.send(
+            embed=embed, file=file, view=view, ephemeral=True
         )
 
-    async def end_game(self) -> None:
-        async with game_data_lock:
-            data = json_util.load_game_data()
-            data.pop(self.host_id, None)
-            json_util.save_game_data(data)
-        try:
-            await self.message.delete()
-        except:
-            pass
-        for child in self.children:
-            child.disabled = True
+
+def board_view(host_id: str) -> discord.ui.View:
+    """Player controls of a running game (Claim Bingo & My Card)."""
+    view = discord.ui.View(timeout=None)
+    view.add_item(ClaimButton(host_id))
+    view.add_item(CardButton(host_id))
+    return view
+
+
+async def delete_messages(messages) -> None:
+    for message in messages:
+        edit_queue.forget(message.id)
         try:
-            await self.message.edit(view=self)
+            await message.delete()
         except:
             pass
 
 
+async def end_game(host_id: str, messages) -> None:
+    """Deletes a game and its number boards."""
+    async with locks.game(host_id):
+        await delete_game(host_id)
+    await delete_messages(messages)
+
+
 class HostView(discord.ui.View):
     """View for host controls before and during the Bingo game."""
 
     def __init__(self):
         super().__init__(timeout=None)
-        self._last_click: dict[int, float] = {}
-
-    async def _check_cooldown(self, user: discord.User) -> float | None:
-        now = time.time()
-        last = self._last_click.get(user.id, 0)
-        delay = config.BUTTON_COOLDOWN
-        if now - last < delay:
-            return delay - (now - last)
-        self._last_click[user.id] = now
-        return None
 
     @discord.ui.button(
         label="Start Bingo",
@@ -274,42 +395,75 @@ class HostView(discord.ui.View):
         custom_id="start_button",
         emoji="🚀",
     )
+    @metrics.timed("start")
     async def start_game(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        retry = await self._check_cooldown(interaction.user)
+        retry = rate_limiter.check(interaction.user.id, "start")
         if retry:
             return await interaction.response.send_message(
                 f"Slow down! Try again in {retry:.1f}s.", ephemeral=True
             )
         host_id = str(interaction.user.id)
-        async with game_data_lock:
-            data = json_util.load_game_data()
-            if host_id not in data or len(data[host_id]["players"]) < 2:
+        async with locks.game(host_id):
+            game = store.get(host_id)
+            if game is None or len(game.players) < 2:
                 return await interaction.response.send_message(
                     "Need at least two players to start.", ephemeral=True
                 )
-            data[host_id]["started"] = True
-            for pid in data[host_id]["players"]:
-                data[host_id][pid] = {
-                    "card": bingo.generate_bingo_card(),
-                    "marks": [],
-                    "bingos": 0,
-                }
-            json_util.save_game_data(data)
-
-        embed = make_bingo_embed(interaction.user.display_name, [], None)
-        bingo_msg = await interaction.channel.send(embed=embed)
-        # Attach player controls (Claim Bingo & My Card)
-        bingo_view = BingoView(host_id, bingo_msg)
-        await bingo_msg.edit(view=bingo_view)
-        await interaction.response.send_message(
-            f"The game has begun, {interaction.user.mention}!", ephemeral=False
-        )
+            if game.started:
+                return await interaction.response.send_message(
+                    "The game has already started.", ephemeral=True
+                )
+            # Answered before any slow work, so the interaction can't expire
+            await interaction.response.send_message(
+                f"The game has begun, {interaction.user.mention}!", ephemeral=False
+            )
+            cards = dict(
+                zip(game.players, bingo.generate_cards(len(game.players), unique=config.UNIQUE_CARDS))
+            )
+            # Indexing thousands of cards takes a while, so other games keep
+            # drawing meanwhile; only this game's lock is held
+            index = await asyncio.to_thread(bingo.WinIndex, cards, 0, game.patterns)
+            store.start_game(host_id, cards, index)
+            # The roster is final; a pending edit of it still goes out
+            lobbies.pop(host_id, None)
+            other_lobbies = [
+                partial_message(channel_id, message_id)
+                for channel_id, message_id in game.lobbies
+                if message_id != interaction.message.id
+            ]
+
+        # The host's name is looked up once and cached on the board for the whole game
+        names.remember(interaction.guild_id, interaction.user.id, interaction.user.display_name)
+        board = Board(interaction.user.display_name)
+        bingo_msg = await interaction.channel.send(embed=board.embed(), view=board_view(host_id))
+        board.message = bingo_msg
+        # Draws start before any cosmetic edit, so none of those can hold them up
+        async with locks.game(host_id):
+            if host_id not in store:
+                return
+            store.set_board(host_id, bingo_msg.channel.id, bingo_msg.id)
+            schedule_draws(host_id, board)
+
         for child in self.children:
             child.disabled = True
-        await interaction.message.edit(view=self)
-        await self._draw_numbers(host_id, bingo_msg)
+        for message in [interaction.message, *other_lobbies]:
+            edit_queue.edit(message, view=self)
+
+        async def post_mirror(channel: discord.abc.Messageable) -> None:
+            mirror = await edit_queue.send(
+                channel, embed=board.embed(), view=board_view(host_id)
+            )
+            async with locks.game(host_id):
+                if host_id in store:
+                    store.add_mirror(host_id, mirror.channel.id, mirror.id)
+                    board.mirrors.append(mirror)
+
+        # A tournament gets a copy of the board in each of its other channels
+        channels = {m.channel.id: m.channel for m in other_lobbies}
+        channels.pop(interaction.channel.id, None)
+        await asyncio.gather(*map(post_mirror, channels.values()), return_exceptions=True)
 
     @discord.ui.button(
         label="Join Game",
@@ -317,46 +471,38 @@ class HostView(discord.ui.View):
         custom_id="join_button",
         emoji="👥",
     )
+    @metrics.timed("join")
     async def join_game(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        retry = await self._check_cooldown(interaction.user)
+        retry = rate_limiter.check(interaction.user.id, "join")
         if retry:
             return await interaction.response.send_message(
                 f"Slow down! Try again in {retry:.1f}s.", ephemeral=True
             )
-        host_id = str(interaction.message.interaction.user.id)
+        host_id = lobby_host(interaction.message)
+        if host_id is None:
+            return await interaction.response.send_message(
+                "Cannot join game.", ephemeral=True
+            )
         player_id = str(interaction.user.id)
-        async with game_data_lock:
-            data = json_util.load_game_data()
-            game = data.get(host_id)
+        async with locks.game(host_id):
+            game = store.get(host_id)
             if (
                 not game
-                or game["started"]
-                or player_id in data
-                or len(game["players"]) >= game["max_players"]
-                or player_id in game["players"]
+                or game.started
+                or player_id in store
+                or len(game.players) >= game.max_players
+                or player_id in game.players
             ):
                 return await interaction.response.send_message(
                     "Cannot join game.", ephemeral=True
                 )
-            game["players"].append(player_id)
-            json_util.save_game_data(data)
-            mentions = [
-                interaction.guild.get_member(int(pid)).mention
-                for pid in game["players"]
-            ]
-            embed = interaction.message.embeds[0]
-            embed.set_field_at(
-                0, name="Max Players", value=str(game["max_players"]), inline=True
-            )
-            embed.set_field_at(
-                1, name="Players", value="\n".join(mentions), inline=False
-            )
+            store.add_player(host_id, player_id)
+            update_lobby(host_id, interaction.message, game).add(player_id)
         await interaction.response.send_message(
             f"{interaction.user.mention} has joined the game!", ephemeral=True
         )
-        await interaction.message.edit(embed=embed, view=self)
 
     @discord.ui.button(
         label="Leave Game",
@@ -364,37 +510,32 @@ class HostView(discord.ui.View):
         custom_id="leave_button",
         emoji="🚪",
     )
+    @metrics.timed("leave")
     async def leave_game(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        retry = await self._check_cooldown(interaction.user)
+        retry = rate_limiter.check(interaction.user.id, "leave")
         if retry:
             return await interaction.response.send_message(
                 f"Slow down! Try again in {retry:.1f}s.", ephemeral=True
             )
-        host_id = str(interaction.message.interaction.user.id)
+        host_id = lobby_host(interaction.message)
+        if host_id is None:
+            return await interaction.response.send_message(
+                "Cannot leave game.", ephemeral=True
+            )
         player_id = str(interaction.user.id)
-        async with game_data_lock:
-            data = json_util.load_game_data()
-            game = data.get(host_id)
-            if not game or player_id not in game["players"] or player_id == host_id:
+        async with locks.game(host_id):
+            game = store.get(host_id)
+            if not game or player_id not in game.players or player_id == host_id:
                 return await interaction.response.send_message(
                     "Cannot leave game.", ephemeral=True
                 )
-            game["players"].remove(player_id)
-            json_util.save_game_data(data)
-            mentions = [
-                interaction.guild.get_member(int(pid)).mention
-                for pid in game["players"]
-            ]
-            embed = interaction.message.embeds[0]
-            embed.set_field_at(
-                1, name="Players", value="\n".join(mentions), inline=False
-            )
+            store.remove_player(host_id, player_id)
+            update_lobby(host_id, interaction.message, game).remove(player_id)
         await interaction.response.send_message(
             f"{interaction.user.mention} has left the game.", ephemeral=True
         )
-        await interaction.message.edit(embed=embed, view=self)
 
     @discord.ui.button(
         label="Cancel Game",
@@ -402,96 +543,484 @@ class HostView(discord.ui.View):
         custom_id="cancel_button",
         emoji="❌",
     )
+    @metrics.timed("cancel")
     async def cancel_game(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        retry = await self._check_cooldown(interaction.user)
+        retry = rate_limiter.check(interaction.user.id, "cancel")
         if retry:
             return await interaction.response.send_message(
                 f"Slow down! Try again in {retry:.1f}s.", ephemeral=True
             )
         host_id = str(interaction.user.id)
 
-        async with game_data_lock:
-            data = json_util.load_game_data()
-            if not data.get(host_id):
+        async with locks.game(host_id):
+            if host_id not in store:
                 await interaction.response.send_message(
                     "You aren't hosting a game.", ephemeral=True
                 )
                 return
-            data.pop(host_id, None)
-            json_util.save_game_data(data)
+            game = await delete_game(host_id)
 
         await interaction.response.send_message(
             f"Game by <@{host_id}>has been cancelled.", ephemeral=False
         )
+        edit_queue.forget(interaction.message.id)
         await interaction.message.delete()
+        await delete_messages(
+            partial_message(channel_id, message_id)
+            for channel_id, message_id in game.lobbies
+            if message_id != interaction.message.id
+        )
+
+
+async def draw_tick(host_id: str) -> bool:
+    """Draws one number for a game; returns False once the game is over."""
+    board = boards.get(host_id)
+    if board is None:
+        return False
+    live = [m for m in board.messages() if not edit_queue.is_missing(m.id)]
+    if not live:
+        # Every board was deleted, so nobody can follow the game anymore
+        return False
+    async with locks.game(host_id):
+        # One draw and one pass over the win index, however many channels
+        # and players a tournament has
+        number = store.draw(host_id)
+        if number is None:
+            return False
+        board.add(number)
+    # Rendered once and fanned out to every copy of the board
+    embed = board.embed()
+    for message in live:
+        edit_queue.edit(message, embed=embed)
+    return board.called < 75
+
+
+# One task draws numbers for every running game
+scheduler = DrawScheduler(metrics.timed("draw")(draw_tick), jitter=config.DRAW_JITTER)
+
+
+def collect_metrics():
+    """Samples owned by other components, read at scrape time."""
+    lock_stats = locks.stats()
+    for name, kind, key in (
+        ("lock_acquisitions_total", "counter", "acquisitions"),
+        ("lock_contended_total", "counter", "contended"),
+        ("lock_wait_seconds_total", "counter", "wait_total"),
+        ("lock_wait_seconds_max", "gauge", "wait_max"),
+    ):
+        # Samples of one metric have to be contiguous in the text format
+        for lock in ("game", "registry"):
+            yield name, kind, {"lock": lock}, lock_stats[lock][key]
 
-    async def _draw_numbers(self, host_id: str, message: discord.Message):
-        numbers = list(range(1, 76))
-        random.shuffle(numbers)
-        drawn: list[int] = []
-        for number in numbers:
-            await asyncio.sleep(config.DRAW_INTERVAL)
-            drawn.append(number)
-            async with game_data_lock:
-                data = json_util.load_game_data()
-                if host_id not in data:
-                    break
-                data[host_id]["numbers_drawn"] = drawn
-                json_util.save_game_data(data)
-            # Fetch host name dynamically
-            guild = message.guild
-            host_member = guild.get_member(int(host_id)) if guild else None
-            host_name = host_member.display_name if host_member else str(host_id)
-            embed = make_bingo_embed(host_name, drawn, number)
+    yield "storage_loads_total", "counter", {}, store.loads
+    yield "storage_load_seconds_total", "counter", {}, store.load_seconds
+    yield "storage_load_bytes_total", "counter", {}, store.load_bytes
+    yield "storage_writes_total", "counter", {}, store.writes
+    yield "storage_write_seconds_total", "counter", {}, store.write_seconds
+    yield "storage_write_bytes_total", "counter", {}, store.write_bytes
+
+    queue = edit_queue.stats()
+    yield "discord_edits_total", "counter", {}, queue["edits_sent"]
+    yield "discord_edits_coalesced_total", "counter", {}, queue["edits_coalesced"]
+    yield "discord_rate_limited_total", "counter", {}, queue["rate_limited"]
+    yield "discord_backoff_seconds_total", "counter", {}, queue["backoff_seconds"]
+    yield "edit_queue_depth", "gauge", {}, queue["depth"]
+
+    for action, count in rate_limiter.rejected.items():
+        yield "clicks_rejected_total", "counter", {"action": action}, count
+    yield "card_image_cache_hits_total", "counter", {}, card_renderer.hits
+    yield "card_image_cache_misses_total", "counter", {}, card_renderer.misses
+
+    yield "name_cache_hits_total", "counter", {}, names.hits
+    yield "name_cache_misses_total", "counter", {}, names.misses
+
+    yield "active_games", "gauge", {}, len(store)
+    yield "active_players", "gauge", {}, store.player_count()
+    yield "scheduled_games", "gauge", {}, len(scheduler)
+
+
+metrics.add_collector(collect_metrics)
+
+
+def schedule_draws(host_id: str, board: Board) -> None:
+    game = store.get(host_id)
+    boards[host_id] = board
+    scheduler.schedule(
+        host_id,
+        game.draw_interval or config.DRAW_INTERVAL,
+        paused=game.paused,
+    )
+
+
+async def resume_games() -> None:
+    """Reattaches the boards of games that were running before a restart and restarts their draws."""
+    await bot.wait_until_ready()
+    for host_id, game in list(store.items()):
+        if not game.started or host_id in scheduler:
+            continue
+        message = None
+        if game.message_id is not None:
             try:
-                await message.edit(embed=embed)
-            except discord.NotFound:
-                break
+                channel = bot.get_channel(game.channel_id) or await bot.fetch_channel(
+                    game.channel_id
+                )
+                message = await channel.fetch_message(game.message_id)
+            except discord.HTTPException:
+                pass
+        async with locks.game(host_id):
+            if message is None or game.winner is not None:
+                # The board is gone (or the game was already won), nothing to resume
+                await delete_game(host_id)
+                continue
+            host_name = await names.get(message.guild, int(host_id))
+            mirrors = [partial_message(*entry) for entry in game.mirrors]
+            schedule_draws(host_id, Board(host_name, store.drawn(host_id), message, mirrors))
+
 
+# Interactions carry everything the bot needs to know about their user, so
+# it only subscribes to guild events (for the channel cache) and caches
+# neither members nor messages
+intents = discord.Intents.none()
+intents.guilds = True
+bot_options = dict(
+    command_prefix="!",
+    intents=intents,
+    member_cache_flags=discord.MemberCacheFlags.none(),
+    chunk_guilds_at_startup=False,
+    max_messages=None,
+    # Rate limits longer than this are raised to the edit queue, which backs
+    # off per channel instead of holding the request (30s is the minimum)
+    max_ratelimit_timeout=30.0,
+)
 
 # Initialize bot
-bot = commands.Bot(command_prefix="!", intents=discord.Intents.all())
+if shards is not None:
+    bot = commands.AutoShardedBot(shard_ids=shards[0], shard_count=shards[1], **bot_options)
+else:
+    bot = commands.Bot(**bot_options)
+
+
+async def sync_commands() -> None:
+    """Syncs the command tree with Discord, unless it hasn't changed since the last sync."""
+    commands_json = json.dumps(
+        [command.to_dict(bot.tree) for command in bot.tree.get_commands()], sort_keys=True
+    )
+    digest = hashlib.sha256(f"{bot.application_id}:{commands_json}".encode()).hexdigest()
+    try:
+        with open(config.COMMAND_HASH_PATH, encoding="utf-8") as f:
+            if f.read().strip() == digest:
+                return
+    except FileNotFoundError:
+        pass
+    await bot.tree.sync()
+    json_util.write_atomic(config.COMMAND_HASH_PATH, digest)
+
+
+@bot.event
+async def setup_hook():
+    # Rebuild the games from the last snapshot plus the journal
+    store.load()
+    store.start()
+    scheduler.start()
+    card_renderer.start()
+    # Lobby and game buttons keep working across restarts
+    bot.add_view(HostView())
+    bot.add_dynamic_items(CardToggle, ClaimButton, CardButton)
+    asyncio.create_task(resume_games())
+    # Commands are global, so one worker syncing them is enough
+    if shards is None or 0 in shards[0]:
+        await sync_commands()
+    if config.METRICS_PORT:
+        # One port per worker process when sharded
+        port = config.METRICS_PORT + (shards[2] if shards is not None else 0)
+        await metrics.serve("127.0.0.1", port)
 
 
 @bot.event
 async def on_ready():
-    async with game_data_lock:
-        json_util.save_game_data({})
-    await bot.tree.sync()
     print(f"Logged in as {bot.user}")
 
 
+# Win patterns used when the host doesn't pick one
+default_patterns = bingo.compile_patterns(config.WIN_PATTERNS)
+
+PATTERN_LABELS = {
+    "blackout": "Blackout (whole card)",
+    "line": "Any line",
+    "row": "Any row",
+    "column": "Any column",
+    "diagonal": "Any diagonal",
+    "corners": "Four corners",
+    "x": "X (both diagonals)",
+    "frame": "Frame (outer edge)",
+}
+
+
+def patterns_text(patterns: tuple[int, ...]) -> str:
+    if patterns == default_patterns:
+        specs = config.WIN_PATTERNS
+    else:
+        specs = [key for key, masks in bingo.PATTERNS.items() if masks == patterns]
+    return ", ".join(PATTERN_LABELS.get(spec, "Custom") for spec in specs) or "Custom"
+
+
+def lobby_embed(host_name: str, game: Game) -> discord.Embed:
+    embed = discord.Embed(
+        title=f"🎱 Bingo game hosted by {host_name}",
+        description="Click 'Join Game' to participate!",
+        colour=discord.Colour.green(),
+    )
+    embed.set_thumbnail(url=config.BINGO_THUMBNAIL_URL)
+    embed.add_field(name="Max Players", value=str(game.max_players), inline=True)
+    embed.add_field(name="To Win", value=patterns_text(game.patterns), inline=False)
+    return Roster(embed, game.players, config.LOBBY_ROSTER_FIELDS).embed()
+
+
 @bot.tree.command(name="bingo", description="Host a Bingo game")
-@app_commands.describe(max_players="Maximum players")
+@app_commands.describe(
+    max_players="Maximum players",
+    draw_interval="Seconds between number draws",
+    pattern="What it takes to win",
+)
+@app_commands.choices(
+    pattern=[app_commands.Choice(name=label, value=key) for key, label in PATTERN_LABELS.items()]
+)
 @app_commands.checks.has_role(int(config.BINGO_ADMIN_ROLE_ID))
-async def bingo_host(interaction: discord.Interaction, max_players: int):
+@metrics.timed("bingo")
+async def bingo_host(
+    interaction: discord.Interaction,
+    max_players: int,
+    draw_interval: app_commands.Range[int, 3, 300] | None = None,
+    pattern: str | None = None,
+):
     user_id = str(interaction.user.id)
-    async with game_data_lock:
-        data = json_util.load_game_data()
-        if user_id in data:
+    patterns = bingo.PATTERNS[pattern] if pattern else default_patterns
+    async with locks.registry():
+        if user_id in store:
             return await interaction.response.send_message(
                 "You're already hosting a game.", ephemeral=True
             )
-        data[user_id] = {
-            "max_players": max_players,
-            "started": False,
-            "players": [user_id],
-            "numbers_drawn": [],
-        }
-        json_util.save_game_data(data)
+        game = store.create(
+            user_id,
+            max_players,
+            draw_interval or config.DRAW_INTERVAL,
+            patterns,
+            interaction.guild_id,
+        )
+
+    embed = lobby_embed(interaction.user.display_name, game)
+    response = await interaction.response.send_message(embed=embed, view=HostView())
+    async with locks.game(user_id):
+        if user_id in store:
+            store.add_lobby(user_id, interaction.channel.id, response.resource.id)
+
+
+@bot.tree.command(
+    name="tournament", description="Open a lobby of your Bingo game in this channel too"
+)
+@app_commands.checks.has_role(int(config.BINGO_ADMIN_ROLE_ID))
+@metrics.timed("tournament")
+async def tournament(interaction: discord.Interaction):
+    host_id = str(interaction.user.id)
+    async with locks.game(host_id):
+        game = store.get(host_id)
+        if game is None or game.started:
+            return await interaction.response.send_message(
+                "Host a game with /bingo first; it can't have started yet.", ephemeral=True
+            )
+        # Admin roles and shards are per guild, so a tournament stays in the host's
+        if game.guild_id is not None and game.guild_id != interaction.guild_id:
+            return await interaction.response.send_message(
+                "Tournament lobbies have to be in the server the game was hosted in.",
+                ephemeral=True,
+            )
+        if any(channel_id == interaction.channel.id for channel_id, _ in game.lobbies):
+            return await interaction.response.send_message(
+                "Your game already has a lobby in this channel.", ephemeral=True
+            )
+        embed = lobby_embed(interaction.user.display_name, game)
+
+    # Every channel shares the game's players, draws and winner
+    lobby = await interaction.channel.send(embed=embed, view=HostView())
+    async with locks.game(host_id):
+        if host_id in store:
+            store.add_lobby(host_id, lobby.channel.id, lobby.id)
+    await interaction.response.send_message(
+        "Lobby opened! Players here join the same game.", ephemeral=True
+    )
+
+
+@bot.tree.command(name="pause", description="Pause the number draws of your Bingo game")
+@metrics.timed("pause")
+async def pause_game(interaction: discord.Interaction):
+    host_id = str(interaction.user.id)
+    async with locks.game(host_id):
+        if not scheduler.pause(host_id):
+            return await interaction.response.send_message(
+                "You don't have a running game to pause.", ephemeral=True
+            )
+        store.set_paused(host_id, True)
+    await interaction.response.send_message("Number draws paused. ⏸️", ephemeral=True)
 
+
+@bot.tree.command(name="resume", description="Resume the number draws of your Bingo game")
+@metrics.timed("resume")
+async def resume_game(interaction: discord.Interaction):
+    host_id = str(interaction.user.id)
+    async with locks.game(host_id):
+        if not scheduler.resume(host_id):
+            return await interaction.response.send_message(
+                "You don't have a paused game to resume.", ephemeral=True
+            )
+        store.set_paused(host_id, False)
+    await interaction.response.send_message("Number draws resumed. ▶️", ephemeral=True)
+
+
+@bot.tree.command(name="leaderboard", description="Show the all-time wins leaderboard")
+@app_commands.describe(top="How many players to show")
+@metrics.timed("leaderboard")
+async def leaderboard(
+    interaction: discord.Interaction, top: app_commands.Range[int, 1, 25] = 10
+):
+    user_id = str(interaction.user.id)
+    rows = await asyncio.to_thread(backend.top_wins, top)
+    rank = await asyncio.to_thread(backend.win_rank, user_id)
+
+    medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+    lines = [
+        f"{medals.get(i, f'**{i}.**')} <@{uid}> — {wins} win{'s' if wins != 1 else ''}"
+        for i, (uid, wins) in enumerate(rows, start=1)
+    ]
     embed = discord.Embed(
-        title=f"🎱 Bingo game hosted by {interaction.user.display_name}",
-        description="Click 'Join Game' to participate!",
-        colour=discord.Colour.green(),
+        title="🏆 Bingo Leaderboard",
+        description="\n".join(lines) or "Nobody has won a game yet.",
+        colour=discord.Colour.gold(),
+    )
+    if rank is not None:
+        embed.set_footer(text=f"You are #{rank[0]} with {rank[1]} wins")
+    else:
+        embed.set_footer(text="You haven't won a game yet")
+    await interaction.response.send_message(embed=embed)
+
+
+@bot.tree.command(name="bingostats", description="Show the bot's runtime metrics")
+@metrics.timed("bingostats")
+async def bingo_stats(interaction: discord.Interaction):
+    if interaction.user.id != config.OWNER_ID:
+        return await interaction.response.send_message(
+            "You don't have permission to use this command.", ephemeral=True
+        )
+
+    embed = discord.Embed(title="📊 Bingo stats", colour=discord.Colour.blurple())
+    embed.add_field(
+        name="Games",
+        value=f"{len(store)} active • {store.player_count()} players • {len(scheduler)} drawing",
+        inline=False,
+    )
+    handlers = "\n".join(
+        f"`{name}` {calls} calls • p50 {p50 * 1000:.0f}ms • p99 {p99 * 1000:.0f}ms"
+        for name, calls, p50, p99 in metrics.handler_summary()[:10]
+    )
+    embed.add_field(name="Handlers", value=handlers or "—", inline=False)
+    lock_stats = locks.stats()["game"]
+    embed.add_field(
+        name="Game locks",
+        value=f"{lock_stats['contended']}/{lock_stats['acquisitions']} contended • {lock_stats['wait_total']:.3f}s waited • max {lock_stats['wait_max'] * 1000:.1f}ms",
+        inline=False,
+    )
+    embed.add_field(
+        name="Storage",
+        value=f"{store.writes} writes • {store.write_bytes / 1024:.0f} KiB • {store.write_seconds:.3f}s",
+        inline=False,
+    )
+    queue = edit_queue.stats()
+    embed.add_field(
+        name="Discord",
+        value=f"{queue['edits_sent']} edits • {queue['edits_coalesced']} coalesced • {queue['depth']} queued • {queue['rate_limited']} × 429",
+        inline=False,
+    )
+    embed.add_field(
+        name="Rate limiter",
+        value=f"{rate_limiter.stats()['rejected_total']} clicks rejected • {len(rate_limiter)} buckets",
+        inline=False,
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+@bot.tree.command(name="games", description="List the games that are drawing numbers")
+@metrics.timed("games")
+async def list_games(interaction: discord.Interaction):
+    if interaction.user.id != config.OWNER_ID:
+        return await interaction.response.send_message(
+            "You don't have permission to use this command.", ephemeral=True
+        )
+
+    lines = []
+    for host_id, entry in sorted(scheduler.games().items()):
+        game = store.get(host_id)
+        players = len(game.players) if game else 0
+        state = "paused" if entry["paused"] else f"next draw in {entry['next_in']:.1f}s"
+        lines.append(
+            f"<@{host_id}> • {players} players • every {entry['interval']:g}s • {state}"
+        )
+    # Whole lines only, within the embed description limit
+    shown = []
+    for line in lines:
+        if sum(len(s) + 1 for s in shown) + len(line) > 3900:
+            break
+        shown.append(line)
+    if len(shown) < len(lines):
+        shown.append(f"…and {len(lines) - len(shown)} more")
+    embed = discord.Embed(
+        title=f"🎱 Running games ({len(lines)})",
+        description="\n".join(shown) or "No game is drawing numbers.",
+        colour=discord.Colour.blurple(),
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+@bot.tree.command(name="profile", description="Profile the bot for a while")
+@app_commands.describe(
+    seconds="How long to capture",
+    mode="sample: low-overhead stack sampling • cprofile: trace every call",
+    top="How many functions to list",
+)
+@metrics.timed("profile")
+async def profile(
+    interaction: discord.Interaction,
+    seconds: app_commands.Range[int, 1, 300] = 30,
+    mode: Literal["sample", "cprofile"] = "sample",
+    top: app_commands.Range[int, 5, 30] = 15,
+):
+    if interaction.user.id != config.OWNER_ID:
+        return await interaction.response.send_message(
+            "You don't have permission to use this command.", ephemeral=True
+        )
+    if profiler.running:
+        return await interaction.response.send_message(
+            "A capture is already running.", ephemeral=True
+        )
+
+    profiler.start(mode)
+    try:
+        await interaction.response.send_message(
+            f"Profiling ({mode}) for {seconds}s...", ephemeral=True
+        )
+        await asyncio.sleep(seconds)
+    finally:
+        path, summary = profiler.stop(top)
+
+    # Keep the summary inside Discord's message limit, whole lines only
+    lines = summary.splitlines()
+    while len(lines) > 2 and sum(len(line) + 1 for line in lines) > 1900:
+        lines.pop()
+    await interaction.followup.send(
+        "```\n" + "\n".join(lines) + "\n```",
+        file=discord.File(path),
+        ephemeral=True,
     )
-    embed.set_thumbnail(url=config.BINGO_THUMBNAIL_URL)
-    embed.add_field(name="Max Players", value=str(max_players), inline=True)
-    embed.add_field(name="Players", value=interaction.user.mention, inline=False)
-    view = HostView()
-    await interaction.response.send_message(embed=embed, view=view)
 
 
 # Global error handler
@@ -511,4 +1040,9 @@ async def on_app_command_error(
 
 
 if __name__ == "__main__":
-    bot.run(config.TOKEN)
+    try:
+        bot.run(config.TOKEN)
+    finally:
+        # Make sure the last changes reach the disk before exiting
+        store.flush_sync()
+        card_renderer.close()
@@ -1,26 +1,322 @@
+import argparse
+import hashlib
+import itertools
 import random
+import secrets
 
+from array import array
+from functools import lru_cache
 
-def generate_bingo_card():
-    card = []
-    while len(card) < 24:
-        num = random.randint(1, 75)
-        if num not in card:
-            card.append(num)
-    return card
 
+# Numbers per B-I-N-G-O column; the N column gives one cell to the free space
+COLUMN_SIZES = (5, 5, 4, 5, 5)
 
-def end_game(host_player: str):
-    game_data = json_util.load_game_data()
-    del game_data[host_player]
-    json_util.save_game_data(game_data)
 
+@lru_cache(maxsize=None)
+def _column_choices(column: int, size: int) -> tuple[int, ...]:
+    """Every way to fill a column, as masks of its numbers (15c+1 to 15c+15)."""
+    base = column * 15
+    return tuple(
+        sum(1 << (base + i) for i in combo)
+        for combo in itertools.combinations(range(15), size)
+    )
 
-def check_winner(game_data: dict, host_player: str):
-    drawn_numbers = set(game_data[host_player]["numbers_drawn"])
-    # Lord please forgive me
-    for player_id, player_data in game_data[host_player].items():
-        if isinstance(player_data, dict) and "card" in player_data:
-            if set(player_data["card"]).issubset(drawn_numbers):
-                return True
-    return False
+
+def generate_cards(count: int, unique: bool = False) -> list[int]:
+    """Standard cards as masks: five numbers from 1-15 under B, five from 16-30 under I, and so on.
+
+    Each column is picked for the whole batch at once from its precomputed
+    fillings. With 'unique', no two cards of the batch are the same.
+    """
+    choices = [_column_choices(c, size) for c, size in enumerate(COLUMN_SIZES)]
+    columns = [random.choices(options, k=count) for options in choices]
+    cards = [b | i | n | g | o for b, i, n, g, o in zip(*columns)]
+    if unique:
+        seen: set[int] = set()
+        for k, card in enumerate(cards):
+            while card in seen:
+                card = sum(random.choice(options) for options in choices)
+            seen.add(card)
+            cards[k] = card
+    return cards
+
+
+def card_mask(numbers) -> int:
+    """Packs a set of numbers (1-75) into an integer, with bit n-1 set for number n."""
+    mask = 0
+    for n in numbers:
+        mask |= 1 << (n - 1)
+    return mask
+
+
+def mask_numbers(mask: int) -> list[int]:
+    """Unpacks a card mask back into its numbers, in ascending order."""
+    numbers = []
+    while mask:
+        low = mask & -mask
+        numbers.append(low.bit_length())
+        mask ^= low
+    return numbers
+
+
+def card_cells(mask: int) -> list[int | None]:
+    """Lays a card out as 25 cells in row-major order, with None on the free center cell.
+
+    Standard cards list each column's numbers top to bottom under their
+    letter. Older cards, drawn from all of 1-75, are laid out in ascending order.
+    """
+    numbers: list[int | None] = mask_numbers(mask)
+    columns: list[list[int | None]] = [[] for _ in COLUMN_SIZES]
+    for n in numbers:
+        columns[(n - 1) // 15].append(n)
+    if tuple(map(len, columns)) != COLUMN_SIZES:
+        numbers.insert(FREE_CELL, None)
+        return numbers
+    columns[2].insert(2, None)
+    return [columns[c][r] for r in range(5) for c in range(5)]
+
+
+FREE_CELL = 12
+
+
+def _cells(*indexes: int) -> int:
+    mask = 0
+    for i in indexes:
+        mask |= 1 << i
+    return mask
+
+
+ROWS = tuple(_cells(*range(r * 5, r * 5 + 5)) for r in range(5))
+COLUMNS = tuple(_cells(*range(c, 25, 5)) for c in range(5))
+DIAGONALS = (_cells(0, 6, 12, 18, 24), _cells(4, 8, 12, 16, 20))
+BLACKOUT = (1 << 25) - 1
+
+# Win patterns as 25-bit cell masks (bit i is cell i of card_cells); a card
+# wins as soon as every cell of any one of its patterns has been called
+PATTERNS: dict[str, tuple[int, ...]] = {
+    "blackout": (BLACKOUT,),
+    "line": ROWS + COLUMNS + DIAGONALS,
+    "row": ROWS,
+    "column": COLUMNS,
+    "diagonal": DIAGONALS,
+    "corners": (_cells(0, 4, 20, 24),),
+    "x": (DIAGONALS[0] | DIAGONALS[1],),
+    "frame": (ROWS[0] | ROWS[4] | COLUMNS[0] | COLUMNS[4],),
+}
+
+
+def parse_pattern(spec: str) -> tuple[int, ...]:
+    """Cell masks of a pattern name, or of a custom grid like "X...X/.X.X./..X../.X.X./X...X"."""
+    if spec in PATTERNS:
+        return PATTERNS[spec]
+    rows = spec.split("/")
+    if len(rows) != 5 or any(len(row) != 5 for row in rows):
+        raise ValueError(f"unknown win pattern {spec!r}")
+    mask = _cells(*(i for i, cell in enumerate("".join(rows)) if cell in "Xx"))
+    if not mask & ~(1 << FREE_CELL):
+        raise ValueError(f"win pattern {spec!r} needs at least one numbered cell")
+    return (mask,)
+
+
+def compile_patterns(specs) -> tuple[int, ...]:
+    """Cell masks of several patterns, without duplicates."""
+    masks: list[int] = []
+    for spec in specs:
+        masks.extend(m for m in parse_pattern(spec) if m not in masks)
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def _pattern_columns(pattern: int) -> tuple[int, ...]:
+    """Per column, which of its numbers (by rank, top to bottom) a pattern covers."""
+    columns = []
+    for c, size in enumerate(COLUMN_SIZES):
+        rows = [r for r in range(5) if pattern >> (r * 5 + c) & 1]
+        if size < 5:
+            # The free cell has no number; the ones below it move up a rank
+            rows = [r - (r > 2) for r in rows if r != 2]
+        columns.append(sum(1 << r for r in rows))
+    return tuple(columns)
+
+
+@lru_cache(maxsize=None)
+def _pattern_ranks(patterns: tuple[int, ...]) -> tuple[tuple[int, ...], ...]:
+    """_pattern_columns of every pattern, grouped by column."""
+    return tuple(zip(*map(_pattern_columns, patterns)))
+
+
+@lru_cache(maxsize=65536)
+def _column_masks(column: int, numbers: int, ranks: tuple[int, ...]) -> tuple[int, ...]:
+    """For each pattern's ranks, the numbers it covers in one column of a card mask."""
+    base = column * 15
+    bits = []
+    while numbers:
+        low = numbers & -numbers
+        bits.append(low << base)
+        numbers ^= low
+    return tuple(
+        sum(bit for rank, bit in enumerate(bits) if wanted >> rank & 1) for wanted in ranks
+    )
+
+
+@lru_cache(maxsize=65536)
+def pattern_masks(card: int, patterns: tuple[int, ...]) -> tuple[int, ...]:
+    """For each pattern, the mask of the card's numbers that have to be drawn.
+
+    Standard cards are worked out from the card mask one column at a time,
+    and a column's 15 bits recur across cards, so those are cached; only
+    older cards are laid out cell by cell.
+    """
+    columns = [card >> (c * 15) & 0x7FFF for c in range(5)]
+    if tuple(column.bit_count() for column in columns) == COLUMN_SIZES:
+        per_column = [
+            _column_masks(c, columns[c], ranks)
+            for c, ranks in enumerate(_pattern_ranks(patterns))
+        ]
+        return tuple(map(sum, zip(*per_column)))
+
+    cells = card_cells(card)
+    masks = []
+    for pattern in patterns:
+        mask = 0
+        for i, number in enumerate(cells):
+            if number is not None and pattern >> i & 1:
+                mask |= 1 << (number - 1)
+        masks.append(mask)
+    return tuple(masks)
+
+
+def has_bingo(masks: tuple[int, ...], drawn_mask: int) -> bool:
+    return any(mask & drawn_mask == mask for mask in masks)
+
+
+def new_seed() -> int:
+    return secrets.randbits(63)
+
+
+def derived_seed(*parts) -> int:
+    """A seed fixed by 'parts', for games from before draws were seeded, so every load agrees on it."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def _shuffled(seed: int) -> tuple[int, ...]:
+    # Fisher-Yates driven by blake2b rather than 'random', so a seed gives the
+    # same order on every Python version and machine
+    order = list(range(1, 76))
+    key = seed.to_bytes(8, "big")
+    for i in range(74, 0, -1):
+        digest = hashlib.blake2b(bytes([i]), key=key, digest_size=8).digest()
+        j = int.from_bytes(digest, "big") % (i + 1)
+        order[i], order[j] = order[j], order[i]
+    return tuple(order)
+
+
+@lru_cache(maxsize=4096)
+def draw_order(seed: int, legacy: tuple[int, ...] = ()) -> tuple[int, ...]:
+    """The full draw sequence of a game: draw i is draw_order(seed)[i].
+
+    'legacy' holds the numbers a game drew before draws were seeded; they
+    keep their place at the start of the sequence.
+    """
+    if not legacy:
+        return _shuffled(seed)
+    taken = set(legacy)
+    return legacy + tuple(n for n in _shuffled(seed) if n not in taken)
+
+
+def drawn_numbers(seed: int, draws: int, legacy: tuple[int, ...] = ()) -> tuple[int, ...]:
+    """The numbers called after 'draws' draws, in order."""
+    return draw_order(seed, legacy)[:draws]
+
+
+def completed_at(
+    seed: int,
+    card: int,
+    legacy: tuple[int, ...] = (),
+    patterns: tuple[int, ...] = (BLACKOUT,),
+) -> int:
+    """How many draws it takes for a card to complete one of the patterns."""
+    position = {n: i for i, n in enumerate(draw_order(seed, legacy))}
+    return min(
+        max(position[n] for n in mask_numbers(mask)) + 1
+        for mask in pattern_masks(card, patterns)
+    )
+
+
+class WinIndex:
+    """Number → (player, pattern) inverted index for one game.
+
+    Every player keeps a count of the numbers still missing from each of
+    their patterns. A draw only touches the patterns holding that number, so
+    winners are known the moment the last number of any pattern is called.
+
+    A (player, pattern) pair is one integer slot, player_index * patterns +
+    pattern, and slots and counts are kept in compact arrays rather than
+    per-entry tuples and lists, so a big game costs a few bytes per number
+    of each card.
+    """
+
+    __slots__ = ("players", "patterns", "holders", "remaining", "winners")
+
+    def __init__(
+        self,
+        cards: dict[str, int],
+        drawn_mask: int = 0,
+        patterns: tuple[int, ...] = (BLACKOUT,),
+    ):
+        self.players = list(cards)
+        self.patterns = len(patterns)
+        self.holders: dict[int, array] = {n: array("I") for n in range(1, 76)}
+        self.remaining = array("B")
+        self.winners: set[str] = set()
+        slot = 0
+        for player_id, card in cards.items():
+            for mask in pattern_masks(card, patterns):
+                for n in mask_numbers(mask):
+                    self.holders[n].append(slot)
+                left = (mask & ~drawn_mask).bit_count()
+                self.remaining.append(left)
+                if not left:
+                    self.winners.add(player_id)
+                slot += 1
+
+    def draw(self, number: int) -> list[str]:
+        """Counts a newly drawn number and returns the players it made winners."""
+        completed = []
+        remaining = self.remaining
+        for slot in self.holders.get(number, ()):
+            remaining[slot] -= 1
+            if not remaining[slot]:
+                player_id = self.players[slot // self.patterns]
+                if player_id not in self.winners:
+                    self.winners.add(player_id)
+                    completed.append(player_id)
+        return completed
+
+
+if __name__ == "__main__":
+    # Audits a game: python -m utils.bingo <seed> <draws> [card numbers...] [--pattern P ...] [--legacy n,n,...]
+    parser = argparse.ArgumentParser(description="Replay the draws of a game")
+    parser.add_argument("seed", type=int)
+    parser.add_argument("draws", type=int)
+    parser.add_argument("card", type=int, nargs="*", help="the 24 numbers of a card to check")
+    parser.add_argument("--pattern", action="append", help="win pattern (default: blackout)")
+    parser.add_argument(
+        "--legacy",
+        type=lambda text: tuple(int(n) for n in text.split(",")),
+        default=(),
+        help="numbers the game drew before it was seeded, as announced with the win",
+    )
+    args = parser.parse_args()
+
+    drawn = drawn_numbers(args.seed, args.draws, args.legacy)
+    print(f"Numbers called after {args.draws} draws:", " ".join(map(str, drawn)))
+    if args.card:
+        card = card_mask(args.card)
+        patterns = compile_patterns(args.pattern or ["blackout"])
+        won = has_bingo(pattern_masks(card, patterns), card_mask(drawn))
+        print(
+            f"Card {'has' if won else 'does not have'} bingo; "
+            f"it completes on draw {completed_at(args.seed, card, args.legacy, patterns)}"
+        )
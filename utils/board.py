@@ -0,0 +1,76 @@
+import bisect
+
+import discord
+
+from datetime import datetime
+
+TOTAL_NUMBERS = 75
+
+
+def column_of(number: int) -> int:
+    """Index of the B-I-N-G-O column a number belongs to."""
+    return (number - 1) // 15
+
+
+class Board:
+    """Number board of one running game.
+
+    Each column keeps its numbers in order along with its rendered field
+    value, so a draw only re-renders the column the new number falls in.
+    """
+
+    __slots__ = ("host_name", "message", "mirrors", "columns", "rendered", "called", "last")
+
+    def __init__(
+        self,
+        host_name: str,
+        drawn=(),
+        message: discord.Message | None = None,
+        mirrors=(),
+    ):
+        self.host_name = host_name
+        self.message = message
+        # Copies of the board in the other channels of a tournament
+        self.mirrors: list[discord.Message | discord.PartialMessage] = list(mirrors)
+        self.columns: list[list[int]] = [[] for _ in "BINGO"]
+        self.rendered: list[str] = ["—"] * 5
+        self.called = 0
+        self.last: int | None = None
+        for number in drawn:
+            self.add(number)
+
+    def add(self, number: int) -> None:
+        column = column_of(number)
+        numbers = self.columns[column]
+        bisect.insort(numbers, number)
+        self.rendered[column] = " ".join(map(str, numbers))
+        self.called += 1
+        self.last = number
+
+    def messages(self) -> list[discord.Message | discord.PartialMessage]:
+        return [self.message, *self.mirrors] if self.message is not None else list(self.mirrors)
+
+    def embed(self) -> discord.Embed:
+        """Constructs an embed showing Bingo columns, progress, and the most recent number."""
+        embed = discord.Embed(
+            title=f"🎱 Bingo Numbers — Hosted by {self.host_name}",
+            color=discord.Colour.green(),
+            timestamp=datetime.utcnow(),
+        )
+        # Show the most recently called number
+        just_called = f"**{self.last}**" if self.last is not None else "—"
+        embed.add_field(name="🎉 Just Called", value=just_called, inline=False)
+
+        # Add each Bingo column
+        for i, letter in enumerate("BINGO"):
+            embed.add_field(
+                name=f"{letter} ({len(self.columns[i])})",
+                value=self.rendered[i],
+                inline=False,
+            )
+
+        # Progress bar footer
+        filled = int(self.called / TOTAL_NUMBERS * 10)
+        bar = "█" * filled + "░" * (10 - filled)
+        embed.set_footer(text=f"{self.called}/{TOTAL_NUMBERS} numbers drawn • {bar}")
+        return embed
@@ -0,0 +1,126 @@
+import asyncio
+import io
+import multiprocessing
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from . import bingo
+
+CELL = 96
+MARGIN = 16
+WIDTH = MARGIN * 2 + CELL * 5
+HEIGHT = MARGIN * 2 + CELL * 6  # one extra row for the B-I-N-G-O header
+
+BACKGROUND = (47, 49, 54)
+GRID = (32, 34, 37)
+CELL_COLOUR = (64, 68, 75)
+MARK_COLOUR = (59, 165, 93)
+TEXT = (255, 255, 255)
+
+
+def _cell_box(row: int, col: int) -> tuple[int, int, int, int]:
+    x = MARGIN + col * CELL
+    y = MARGIN + (row + 1) * CELL
+    return (x + 2, y + 2, x + CELL - 2, y + CELL - 2)
+
+
+@lru_cache(maxsize=None)
+def _font(size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.load_default(size=size)
+
+
+@lru_cache(maxsize=1)
+def _template() -> Image.Image:
+    """Empty card with header and grid, drawn once per worker process."""
+    image = Image.new("RGB", (WIDTH, HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    for col, letter in enumerate("BINGO"):
+        x = MARGIN + col * CELL + CELL // 2
+        draw.text((x, MARGIN + CELL // 2), letter, font=_font(56), fill=TEXT, anchor="mm")
+    for row in range(5):
+        for col in range(5):
+            draw.rectangle(_cell_box(row, col), fill=CELL_COLOUR, outline=GRID, width=2)
+    # Free space
+    draw.rectangle(_cell_box(2, 2), fill=MARK_COLOUR, outline=GRID, width=2)
+    draw.text(_centre(2, 2), "FREE", font=_font(26), fill=TEXT, anchor="mm")
+    return image
+
+
+def _centre(row: int, col: int) -> tuple[int, int]:
+    x0, y0, x1, y1 = _cell_box(row, col)
+    return ((x0 + x1) // 2, (y0 + y1) // 2)
+
+
+def render_card(card: int, marks: int) -> bytes:
+    """Draws a card (and its marked numbers) on top of the grid template and returns PNG bytes."""
+    image = _template().copy()
+    draw = ImageDraw.Draw(image)
+    font = _font(40)
+    for i, number in enumerate(bingo.card_cells(card)):
+        if number is None:
+            continue
+        row, col = divmod(i, 5)
+        if marks >> (number - 1) & 1:
+            draw.rectangle(_cell_box(row, col), fill=MARK_COLOUR, outline=GRID, width=2)
+        draw.text(_centre(row, col), str(number), font=font, fill=TEXT, anchor="mm")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=False)
+    return buffer.getvalue()
+
+
+class CardRenderer:
+    """Renders card images in a process pool, caching results by (card mask, marks mask)."""
+
+    def __init__(self, workers: int = 2, cache_size: int = 1024):
+        self.workers = workers
+        self.cache_size = cache_size
+        self._pool: ProcessPoolExecutor | None = None
+        # Finished PNGs and in-flight renders, so identical requests share one render
+        self._cache: OrderedDict[tuple[int, int], asyncio.Future] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def render(self, card: int, marks: int) -> bytes:
+        key = (card, marks & card)
+        future = self._cache.get(key)
+        if future is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        if self._pool is None:
+            self.start()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._pool, render_card, *key
+        )
+        self._cache[key] = future
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            self._cache.pop(key, None)
+            raise
+
+    def start(self) -> None:
+        """Creates the worker pool.
+
+        Workers come from a fork server rather than being forked from the
+        bot, which by then runs threads of its own and holds every game.
+        """
+        if self._pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
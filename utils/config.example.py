@@ -5,3 +5,26 @@ OWNER_ID = 1  # CHANGE ME (USER ID, INTEGER)
 BINGO_THUMBNAIL_URL = ""
 BUTTON_COOLDOWN = 5
 DRAW_INTERVAL = 10
+GAME_DATA_FLUSH_INTERVAL = 5
+JOURNAL_PATH = "./bingo_game_journal.log"
+JOURNAL_COMPACT_BYTES = 1_000_000
+DRAW_JITTER = 1
+EDIT_MIN_INTERVAL = 1
+CARD_RENDER_WORKERS = 2
+CARD_IMAGE_CACHE_SIZE = 1024
+LEADERBOARD_PATH = "./bingo_leaderboard.json"
+STORAGE_BACKEND = "json"  # "json" or "sqlite"
+DATABASE_PATH = "./bingo.db"
+RATE_LIMITS = {}  # e.g. {"claim": (3, 5)}
+RATE_LIMIT_TTL = 600
+METRICS_PORT = 9108  # 0 disables the metrics endpoint
+PROFILE_DIR = "./profiles"  # Where /profile captures are saved
+PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples in sample mode
+SHARD_COUNT = 0  # Shards for "python -m utils.sharding" (0 asks Discord)
+SHARDS_PER_PROCESS = 1
+WIN_PATTERNS = ["blackout"]  # Names from bingo.PATTERNS or 5x5 grids like "X...X/.X.X./..X../.X.X./X...X"
+UNIQUE_CARDS = True  # Never deal the same card twice in a game
+LOBBY_EDIT_DELAY = 2  # Seconds of joins/leaves folded into one lobby edit
+LOBBY_ROSTER_FIELDS = 4  # Embed fields of player mentions before the rest is counted
+COMMAND_HASH_PATH = "./bingo_commands.sha256"  # Hash of the last synced command tree
+NAME_CACHE_SIZE = 10_000
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+
+import discord
+
+
+class _ChannelQueue:
+    __slots__ = ("urgent", "edits", "wakeup", "worker", "last_sent", "backoff")
+
+    def __init__(self):
+        # (coroutine factory, future) pairs, sent before any cosmetic edit
+        self.urgent: list[tuple] = []
+        # message id -> (message, fields); a newer edit replaces the pending one
+        self.edits: dict[int, tuple[discord.Message, dict]] = {}
+        self.wakeup = asyncio.Event()
+        self.worker: asyncio.Task | None = None
+        self.last_sent = 0.0
+        # Next wait after a 429 that came without a retry_after
+        self.backoff = 1.0
+
+
+class _RateLimitLog(logging.Handler):
+    """Counts the 429s discord.py waits out by itself, from its HTTP client's warnings."""
+
+    def __init__(self, queue: "EditQueue"):
+        super().__init__(logging.WARNING)
+        self.queue = queue
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.msg.startswith("We are being rate limited") and "Retrying in" in record.msg:
+            self.queue.rate_limited += 1
+            self.queue.backoff_seconds += record.args[-1]
+
+
+class EditQueue:
+    """Outbound queue per channel for board and lobby updates.
+
+    Pending edits of the same message are coalesced, so only the latest board
+    state is ever sent. Urgent messages (like winner announcements) jump ahead
+    of cosmetic edits. Interaction responses don't go through here, they have
+    their own rate limit bucket and must be answered within three seconds.
+    """
+
+    def __init__(self, min_interval: float = 1.0, max_backoff: float = 30.0):
+        self.min_interval = min_interval
+        self.max_backoff = max_backoff
+        self._channels: dict[int, _ChannelQueue] = {}
+        # Messages that turned out to be deleted
+        self._missing: set[int] = set()
+        self.edits_submitted = 0
+        self.edits_sent = 0
+        self.edits_coalesced = 0
+        self.urgent_sent = 0
+        self.rate_limited = 0
+        self.backoff_seconds = 0.0
+
+    def watch_http_log(self, logger: str = "discord.http") -> None:
+        """Also counts the 429s discord.py retries internally, which never reach _call."""
+        logging.getLogger(logger).addHandler(_RateLimitLog(self))
+
+    def _queue(self, channel_id: int) -> _ChannelQueue:
+        queue = self._channels.get(channel_id)
+        if queue is None:
+            queue = self._channels[channel_id] = _ChannelQueue()
+        if queue.worker is None or queue.worker.done():
+            queue.worker = asyncio.create_task(self._work(channel_id, queue))
+        return queue
+
+    def edit(self, message: discord.Message, **fields) -> None:
+        """Queues 'message.edit(**fields)', merged into any edit still waiting for the same message."""
+        self.edits_submitted += 1
+        queue = self._queue(message.channel.id)
+        pending = queue.edits.get(message.id)
+        if pending is not None:
+            self.edits_coalesced += 1
+            fields = {**pending[1], **fields}
+        queue.edits[message.id] = (message, fields)
+        queue.wakeup.set()
+
+    async def send(self, channel: discord.abc.Messageable, *args, **kwargs):
+        """Sends a message ahead of every queued edit and waits for it to go out."""
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queue(channel.id)
+        queue.urgent.append((lambda: channel.send(*args, **kwargs), future))
+        queue.wakeup.set()
+        return await future
+
+    def is_missing(self, message_id: int) -> bool:
+        """Whether an edit found the message deleted."""
+        return message_id in self._missing
+
+    def forget(self, message_id: int) -> None:
+        """Drops pending edits of a message that is about to be deleted."""
+        self._missing.discard(message_id)
+        for queue in self._channels.values():
+            queue.edits.pop(message_id, None)
+
+    def depth(self) -> int:
+        return sum(len(q.urgent) + len(q.edits) for q in self._channels.values())
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth(),
+            "channels": len(self._channels),
+            "edits_submitted": self.edits_submitted,
+            "edits_sent": self.edits_sent,
+            "edits_coalesced": self.edits_coalesced,
+            "urgent_sent": self.urgent_sent,
+            "rate_limited": self.rate_limited,
+            "backoff_seconds": self.backoff_seconds,
+        }
+
+    async def _call(self, factory):
+        """Runs one request, backing off and retrying while Discord answers 429.
+
+        discord.py sleeps through short 429s itself; longer ones than the
+        client's max_ratelimit_timeout are raised as RateLimited, and 429s
+        it gave up retrying as HTTPException.
+        """
+        backoff = 1.0
+        while True:
+            try:
+                return await factory()
+            except discord.RateLimited as e:
+                retry_after = e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    raise
+                retry_after = backoff
+                backoff = min(backoff * 2, self.max_backoff)
+            self.rate_limited += 1
+            self.backoff_seconds += retry_after
+            await asyncio.sleep(retry_after)
+
+    async def _work(self, channel_id: int, queue: _ChannelQueue) -> None:
+        while True:
+            if queue.urgent:
+                factory, future = queue.urgent.pop(0)
+                try:
+                    result = await self._call(factory)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    self.urgent_sent += 1
+                    if not future.done():
+                        future.set_result(result)
+                continue
+
+            if queue.edits:
+                # Pace cosmetic edits; newer edits keep replacing the pending one meanwhile
+                wait = queue.last_sent + self.min_interval - time.monotonic()
+                if wait > 0:
+                    queue.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(queue.wakeup.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                message_id = next(iter(queue.edits))
+                message, fields = queue.edits.pop(message_id)
+                queue.last_sent = time.monotonic()
+                try:
+                    await message.edit(**fields)
+                except discord.NotFound:
+                    self._missing.add(message_id)
+                except (discord.RateLimited, discord.HTTPException) as e:
+                    if isinstance(e, discord.HTTPException) and e.status != 429:
+                        print(f"Failed to edit message {message_id}: {e}")
+                        continue
+                    if isinstance(e, discord.RateLimited):
+                        retry_after = e.retry_after
+                    else:
+                        retry_after = queue.backoff
+                        queue.backoff = min(queue.backoff * 2, self.max_backoff)
+                    self.rate_limited += 1
+                    self.backoff_seconds += retry_after
+                    # Back in the queue under any newer state of the message, so
+                    # the retry after the backoff sends only the latest one
+                    newer = queue.edits.pop(message_id, None)
+                    if newer is not None:
+                        self.edits_coalesced += 1
+                        fields = {**fields, **newer[1]}
+                    queue.edits[message_id] = (message, fields)
+                    await asyncio.sleep(retry_after)
+                else:
+                    self.edits_sent += 1
+                    queue.backoff = 1.0
+                continue
+
+            # Nothing left to send; let the worker go instead of idling forever
+            self._channels.pop(channel_id, None)
+            return
@@ -0,0 +1,97 @@
+import json
+import os
+
+
+class Journal:
+    """Append-only log of game events, replayed on startup to rebuild the game store.
+
+    Each event is one JSON object per line. Compaction rotates the log to
+    '<path>.old' right after a snapshot is taken, and the rotated file is
+    deleted once that snapshot is safely on disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rotated_path = f"{path}.old"
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._trim_torn_line()
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _trim_torn_line(self) -> None:
+        """Cuts off a line a crash left half-written, so the next event starts a line of its own."""
+        try:
+            f = open(self.path, "rb+")
+        except FileNotFoundError:
+            return
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            if not end:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            # Walk back to the end of the last complete line
+            pos = end
+            while pos > 0:
+                start = max(0, pos - 65536)
+                f.seek(start)
+                newline = f.read(pos - start).rfind(b"\n")
+                if newline != -1:
+                    f.truncate(start + newline + 1)
+                    return
+                pos = start
+            f.truncate(0)
+
+    def append(self, event: dict) -> None:
+        f = self._open()
+        f.write(json.dumps(event, separators=(",", ":")) + "\n")
+        f.flush()
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def replay(self):
+        """Yields every event still on disk, oldest first. A torn last line is skipped."""
+        for path in (self.rotated_path, self.path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+            except FileNotFoundError:
+                continue
+
+    def rotate(self) -> bool:
+        """Moves the current log aside so new events start a fresh file.
+
+        Returns False if an earlier rotated log is still waiting for its snapshot.
+        """
+        if os.path.exists(self.rotated_path):
+            return False
+        self.close()
+        try:
+            os.replace(self.path, self.rotated_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def discard_rotated(self) -> None:
+        """Deletes the rotated log; only call this once a newer snapshot is on disk."""
+        try:
+            os.remove(self.rotated_path)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
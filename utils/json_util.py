@@ -1,21 +1,89 @@
 import json
+import os
+import tempfile
+import threading
 
 from . import config
 
 
-def save_game_data(game_data):
-    with open(config.GAME_DATA_PATH, "w") as f:
-        json.dump(game_data, f)
-
-
-def load_game_data():
+def write_atomic(path: str, text: str):
+    """Writes 'text' to a temporary file next to 'path' and renames it into place, so readers never see a half-written file."""
+    # A unique temporary file, so concurrent writers can't rename each other's
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def load_game_data(path: str | None = None):
     try:
-        with open(config.GAME_DATA_PATH, "r") as f:
+        with open(path or config.GAME_DATA_PATH, "r") as f:
             return json.load(f)
     except FileNotFoundError:
         return {}
 
 
+class JsonBackend:
+    """Game storage in a single JSON file, with the leaderboard in a second one."""
+
+    def __init__(self, path: str, leaderboard_path: str):
+        self.path = path
+        self.leaderboard_path = leaderboard_path
+        self._wins: dict[str, int] | None = None
+        # Leaderboard calls run in worker threads, possibly several at once
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        return load_game_data(self.path)
+
+    def write(self, encoded: dict[str, str], changed: set[str]) -> int:
+        """Rewrites the whole file from the pre-encoded games; returns the bytes written."""
+        body = ",".join(f"{json.dumps(k)}:{v}" for k, v in encoded.items())
+        text = "{" + body + "}"
+        write_atomic(self.path, text)
+        return len(text)
+
+    def _leaderboard(self) -> dict[str, int]:
+        if self._wins is None:
+            try:
+                with open(self.leaderboard_path, encoding="utf-8") as f:
+                    self._wins = json.load(f)
+            except FileNotFoundError:
+                self._wins = {}
+        return self._wins
+
+    def record_win(self, user_id: str):
+        with self._lock:
+            wins = self._leaderboard()
+            wins[user_id] = wins.get(user_id, 0) + 1
+            write_atomic(self.leaderboard_path, json.dumps(wins))
+
+    def top_wins(self, limit: int) -> list[tuple[str, int]]:
+        with self._lock:
+            wins = self._leaderboard()
+            return sorted(wins.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+
+    def win_rank(self, user_id: str) -> tuple[int, int] | None:
+        """Returns (rank, wins) of a user, or None if they never won."""
+        with self._lock:
+            wins = self._leaderboard()
+            if user_id not in wins:
+                return None
+            count = wins[user_id]
+            return sum(1 for w in wins.values() if w > count) + 1, count
+
+
 def read_json(filepath: str) -> dict:
     """Takes only one argument, the path to the .json file on the system. Opens the requested file in a pythonic format (dictionary)"""
     with open(f"{filepath}.json", encoding="utf-8") as f:
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from contextlib import asynccontextmanager
+
+
+class LockStats:
+    """Wait-time counters for one kind of lock."""
+
+    __slots__ = ("acquisitions", "contended", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, contended: bool) -> None:
+        self.acquisitions += 1
+        if contended:
+            self.contended += 1
+        self.wait_total += waited
+        if waited > self.wait_max:
+            self.wait_max = waited
+
+    def as_dict(self) -> dict:
+        return {
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "wait_total": self.wait_total,
+            "wait_max": self.wait_max,
+        }
+
+
+class LockRegistry:
+    """One lock per game (keyed by host id), plus a global lock for creating and deleting games.
+
+    Always take a game lock before the registry lock, never the other way around.
+    """
+
+    def __init__(self):
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._registry_lock = asyncio.Lock()
+        self.game_stats = LockStats()
+        self.registry_stats = LockStats()
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def _game_lock(self, host_id: str) -> asyncio.Lock:
+        lock = self._locks.get(host_id)
+        if lock is None:
+            lock = self._locks[host_id] = asyncio.Lock()
+        return lock
+
+    @staticmethod
+    @asynccontextmanager
+    async def _timed(lock: asyncio.Lock, stats: LockStats):
+        contended = lock.locked()
+        start = time.perf_counter()
+        async with lock:
+            stats.record(time.perf_counter() - start, contended)
+            yield
+
+    def game(self, host_id: str):
+        """Serializes changes to a single game."""
+        return self._timed(self._game_lock(host_id), self.game_stats)
+
+    def registry(self):
+        """Serializes creating and deleting games."""
+        return self._timed(self._registry_lock, self.registry_stats)
+
+    def discard(self, host_id: str) -> None:
+        """Drops the lock of a deleted game so the registry doesn't grow forever."""
+        self._locks.pop(host_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "games": len(self._locks),
+            "game": self.game_stats.as_dict(),
+            "registry": self.registry_stats.as_dict(),
+        }
@@ -0,0 +1,153 @@
+import functools
+import time
+
+from aiohttp import web
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the largest bound if it overflowed)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[min(i, len(self.buckets) - 1)]
+        return self.buckets[-1]
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    """Latency histograms and counters, rendered in the Prometheus text format.
+
+    Values owned by other components (lock waits, edit queue, store sizes...)
+    are read at scrape time through collectors instead of being copied here.
+    """
+
+    def __init__(self, prefix: str = "bingo"):
+        self.prefix = prefix
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.counters: dict[tuple[str, str], float] = {}
+        # Callables returning (name, type, labels, value) samples
+        self._collectors: list = []
+        self._runner: web.AppRunner | None = None
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def add_collector(self, collector) -> None:
+        self._collectors.append(collector)
+
+    def timed(self, handler: str):
+        """Records the latency (and failures) of an async handler under handler=<name>."""
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    self.inc("handler_errors_total", handler=handler)
+                    raise
+                finally:
+                    self.observe(
+                        "handler_seconds", time.perf_counter() - start, handler=handler
+                    )
+
+            return wrapper
+
+        return decorator
+
+    def handler_summary(self) -> list[tuple[str, int, float, float]]:
+        """(handler, calls, p50, p99) of every timed handler, busiest first."""
+        rows = [
+            (labels.split('"')[1], h.count, h.quantile(0.5), h.quantile(0.99))
+            for (name, labels), h in self.histograms.items()
+            if name == "handler_seconds"
+        ]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def render(self) -> str:
+        lines = []
+        typed = set()
+
+        def type_line(name: str, kind: str):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            full = f"{self.prefix}_{name}"
+            type_line(full, "histogram")
+            inner = labels[1:-1] + "," if labels else ""
+            cumulative = 0
+            for bound, n in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                cumulative += n
+                lines.append(f'{full}_bucket{{{inner}le="{bound}"}} {cumulative}')
+            lines.append(f"{full}_sum{labels} {histogram.sum}")
+            lines.append(f"{full}_count{labels} {histogram.count}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            full = f"{self.prefix}_{name}"
+            type_line(full, "counter")
+            lines.append(f"{full}{labels} {value}")
+
+        for collector in self._collectors:
+            for name, kind, labels, value in collector():
+                full = f"{self.prefix}_{name}"
+                type_line(full, kind)
+                lines.append(f"{full}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.render(), content_type="text/plain")
+
+    async def serve(self, host: str, port: int) -> None:
+        """Serves /metrics over HTTP; meant to be bound to localhost only."""
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
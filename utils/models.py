@@ -0,0 +1,186 @@
+import json
+
+from typing import NamedTuple
+
+from . import bingo
+
+
+def _mask(value) -> int:
+    # Older saves stored cards and marks as lists of numbers
+    return value if isinstance(value, int) else bingo.card_mask(value)
+
+
+class PlayerCard:
+    """One player's card and marks, both as number masks (bit n-1 for number n)."""
+
+    __slots__ = ("card", "marks")
+
+    def __init__(self, card: int, marks: int = 0):
+        self.card = card
+        self.marks = marks
+
+
+class Game:
+    """State of one game, keyed by its host's id in the store."""
+
+    __slots__ = (
+        "max_players",
+        "draw_interval",
+        "started",
+        "players",
+        "seed",
+        "draws",
+        "legacy_draws",
+        "patterns",
+        "cards",
+        "guild_id",
+        "channel_id",
+        "message_id",
+        "lobbies",
+        "mirrors",
+        "paused",
+        "winner",
+    )
+
+    def __init__(
+        self,
+        max_players: int,
+        draw_interval: float | None = None,
+        seed: int = 0,
+        patterns: tuple[int, ...] = (bingo.BLACKOUT,),
+    ):
+        self.max_players = max_players
+        self.draw_interval = draw_interval
+        self.started = False
+        self.players: list[str] = []
+        # The draw order follows from the seed, so the draw count is all the state
+        self.seed = seed
+        self.draws = 0
+        # Numbers drawn before draws were seeded, which come first in the order
+        self.legacy_draws: tuple[int, ...] = ()
+        # Win patterns as cell masks (see bingo.PATTERNS)
+        self.patterns = patterns
+        self.cards: dict[str, PlayerCard] = {}
+        # Guild the game was hosted in; every lobby of a tournament is in it
+        self.guild_id: int | None = None
+        # Where the number board lives, once the game has started
+        self.channel_id: int | None = None
+        self.message_id: int | None = None
+        # Every lobby message of the game, and the boards of the channels other
+        # than the host's, as [channel id, message id]; a game with lobbies in
+        # several channels runs as one tournament with a single draw stream
+        self.lobbies: list[list[int]] = []
+        self.mirrors: list[list[int]] = []
+        self.paused = False
+        self.winner: str | None = None
+
+    def order(self) -> tuple[int, ...]:
+        return bingo.draw_order(self.seed, self.legacy_draws)
+
+    def drawn(self) -> tuple[int, ...]:
+        """The numbers called so far, in order."""
+        return self.order()[: self.draws]
+
+    def to_dict(self) -> dict:
+        data = {
+            "max_players": self.max_players,
+            "draw_interval": self.draw_interval,
+            "started": self.started,
+            "players": self.players,
+            "seed": self.seed,
+            "draws": self.draws,
+            "patterns": list(self.patterns),
+            "cards": {pid: [c.card, c.marks] for pid, c in self.cards.items()},
+        }
+        if self.legacy_draws:
+            data["legacy_draws"] = list(self.legacy_draws)
+        if self.guild_id is not None:
+            data["guild_id"] = self.guild_id
+        if self.message_id is not None:
+            data["channel_id"] = self.channel_id
+            data["message_id"] = self.message_id
+        if self.lobbies:
+            data["lobbies"] = self.lobbies
+        if self.mirrors:
+            data["mirrors"] = self.mirrors
+        if self.paused:
+            data["paused"] = True
+        if self.winner is not None:
+            data["winner"] = self.winner
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict, host_id: str = "") -> "Game":
+        """Reads the persisted format, including the dict layouts of older saves.
+
+        'host_id' is the game's key in the store; older saves derive their seed from it.
+        """
+        game = cls(
+            data["max_players"],
+            data.get("draw_interval"),
+            data.get("seed", 0),
+            tuple(data.get("patterns", (bingo.BLACKOUT,))),
+        )
+        game.started = data.get("started", False)
+        game.players = list(data.get("players", ()))
+        if "seed" in data:
+            game.draws = data.get("draws", 0)
+            game.legacy_draws = tuple(data.get("legacy_draws", ()))
+        else:
+            # Saved before draws were seeded: the numbers drawn so far become
+            # the fixed start of a seeded sequence. The seed has to come out
+            # the same on every load until the game is rewritten, or journaled
+            # draws would replay against another order
+            drawn = data.get("numbers_drawn", ())
+            game.seed = bingo.derived_seed(host_id, tuple(drawn))
+            game.draws = len(drawn)
+            game.legacy_draws = tuple(drawn)
+
+        if "cards" in data:
+            # Saves from before the unused bingo counter was dropped hold a third item
+            for pid, (card, marks, *_) in data["cards"].items():
+                game.cards[pid] = PlayerCard(_mask(card), _mask(marks))
+        else:
+            # Player records used to sit next to the game's own keys
+            for pid in game.players:
+                record = data.get(pid)
+                if isinstance(record, dict):
+                    game.cards[pid] = PlayerCard(
+                        _mask(record["card"]),
+                        _mask(record.get("marks", ())),
+                    )
+
+        game.guild_id = data.get("guild_id")
+        game.channel_id = data.get("channel_id")
+        game.message_id = data.get("message_id")
+        game.lobbies = [list(entry) for entry in data.get("lobbies", ())]
+        game.mirrors = [list(entry) for entry in data.get("mirrors", ())]
+        game.paused = data.get("paused", False)
+        game.winner = data.get("winner")
+        return game
+
+
+class Snapshot(NamedTuple):
+    """What a claim needs to know about a started game as of one draw.
+
+    Each draw publishes a new snapshot instead of changing the old one, so
+    claims can read it without taking the game's lock.
+    """
+
+    draws: int
+    # Players holding a card, and those whose card has bingo after 'draws' draws
+    players: frozenset[str]
+    winners: frozenset[str]
+
+
+def is_current(data: dict) -> bool:
+    """Whether a persisted game is already in the latest format."""
+    return "seed" in data and "cards" in data
+
+
+def encode(game: Game) -> str:
+    return json.dumps(game.to_dict(), separators=(",", ":"))
+
+
+def decode(text: str, host_id: str = "") -> Game:
+    return Game.from_dict(json.loads(text), host_id)
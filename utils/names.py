@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+import discord
+
+
+class NameCache:
+    """Bounded LRU of display names, keyed by (guild id, user id).
+
+    The bot runs without the members intent, so a name missing here is
+    looked up once (cache first, then the API) and remembered.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._names: OrderedDict[tuple[int | None, int], str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def remember(self, guild_id: int | None, user_id: int, name: str) -> None:
+        key = (guild_id, user_id)
+        self._names[key] = name
+        self._names.move_to_end(key)
+        while len(self._names) > self.maxsize:
+            self._names.popitem(last=False)
+
+    async def get(self, guild: discord.Guild | None, user_id: int) -> str:
+        key = (guild.id if guild else None, user_id)
+        name = self._names.get(key)
+        if name is not None:
+            self.hits += 1
+            self._names.move_to_end(key)
+            return name
+
+        self.misses += 1
+        name = str(user_id)
+        if guild is not None:
+            member = guild.get_member(user_id)
+            if member is None:
+                try:
+                    member = await guild.fetch_member(user_id)
+                except discord.HTTPException:
+                    member = None
+            if member is not None:
+                name = member.display_name
+        self.remember(key[0], user_id, name)
+        return name
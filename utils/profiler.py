@@ -0,0 +1,136 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+
+from collections import Counter
+
+
+def _label(code) -> str:
+    path = os.path.join(*code.co_filename.split(os.sep)[-2:])
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    """Records the stack of one thread every 'interval' seconds."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="bingo-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_label(frame.f_code))
+                frame = frame.f_back
+            # Root first, as flame graph tools expect
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """One capture at a time of the event loop thread, without restarting the bot.
+
+    'sample' mode walks the loop's stack from a background thread every
+    'interval' seconds and saves collapsed stacks (flamegraph.pl / speedscope
+    format); 'cprofile' mode traces every call and saves a pstats file.
+    """
+
+    MODES = ("sample", "cprofile")
+
+    def __init__(self, directory: str, interval: float = 0.005):
+        self.directory = directory
+        self.interval = interval
+        self.mode: str | None = None
+        self._started = 0.0
+        self._sampler: _Sampler | None = None
+        self._profile: cProfile.Profile | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str) -> None:
+        """Starts capturing; must be called from the thread to profile."""
+        if self.running:
+            raise RuntimeError("a capture is already running")
+        if mode not in self.MODES:
+            raise ValueError(f"unknown profiler mode {mode!r}")
+        if mode == "sample":
+            self._sampler = _Sampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self.mode = mode
+        self._started = time.monotonic()
+
+    def stop(self, top: int = 15) -> tuple[str, str]:
+        """Stops the capture, writes it to disk and returns (path, top-N summary)."""
+        if not self.running:
+            raise RuntimeError("no capture is running")
+        elapsed = time.monotonic() - self._started
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        try:
+            if self.mode == "sample":
+                self._sampler.stop()
+                path = os.path.join(self.directory, f"profile-{stamp}.collapsed")
+                return path, self._dump_samples(path, elapsed, top)
+            self._profile.disable()
+            path = os.path.join(self.directory, f"profile-{stamp}.pstats")
+            return path, self._dump_pstats(path, elapsed, top)
+        finally:
+            self.mode = None
+            self._sampler = None
+            self._profile = None
+
+    def _dump_samples(self, path: str, elapsed: float, top: int) -> str:
+        stacks = self._sampler.stacks
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, count in stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+
+        samples = self._sampler.samples or 1
+        lines = [
+            f"{self._sampler.samples} samples in {elapsed:.1f}s",
+            f"{'self%':>6} {'total%':>6}  function",
+        ]
+        for label, count in own.most_common(top):
+            lines.append(
+                f"{count * 100 / samples:6.1f} {total[label] * 100 / samples:6.1f}  {label}"
+            )
+        return "\n".join(lines)
+
+    def _dump_pstats(self, path: str, elapsed: float, top: int) -> str:
+        self._profile.dump_stats(path)
+        stats = pstats.Stats(self._profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+
+        lines = [
+            f"{stats.total_calls} calls in {elapsed:.1f}s",
+            f"{'tottime':>8} {'cumtime':>8} {'calls':>7}  function",
+        ]
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in rows[:top]:
+            where = os.path.join(*filename.split(os.sep)[-2:]) if filename != "~" else "~"
+            lines.append(f"{tottime:8.3f} {cumtime:8.3f} {calls:7}  {name} ({where}:{line})")
+        return "\n".join(lines)
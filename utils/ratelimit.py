@@ -0,0 +1,67 @@
+import time
+
+
+class RateLimiter:
+    """Token buckets keyed by (user, action), on a monotonic clock.
+
+    'limits' maps an action to (burst, seconds per token); actions without an
+    entry use 'default'. A bucket that sat idle long enough to refill
+    completely is the same as no bucket at all, so those are swept out every
+    'ttl' seconds and the limiter never grows past its active users.
+    """
+
+    def __init__(
+        self,
+        default: tuple[int, float],
+        limits: dict[str, tuple[int, float]] | None = None,
+        ttl: float = 600.0,
+    ):
+        self.default = default
+        self.limits = limits or {}
+        self.ttl = ttl
+        # (user id, action) -> [tokens, last update]
+        self._buckets: dict[tuple[int, str], list[float]] = {}
+        self._last_sweep = time.monotonic()
+        self.allowed = 0
+        self.rejected: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def check(self, user_id: int, action: str) -> float | None:
+        """Takes a token for the user's action; returns the seconds to wait if there is none."""
+        now = time.monotonic()
+        if now - self._last_sweep >= self.ttl:
+            self._sweep(now)
+
+        burst, period = self.limits.get(action, self.default)
+        key = (user_id, action)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now]
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) / period)
+            bucket[1] = now
+
+        if bucket[0] < 1:
+            self.rejected[action] = self.rejected.get(action, 0) + 1
+            return (1 - bucket[0]) * period
+        bucket[0] -= 1
+        self.allowed += 1
+        return None
+
+    def _sweep(self, now: float) -> None:
+        self._last_sweep = now
+        for key, (tokens, last) in list(self._buckets.items()):
+            burst, period = self.limits.get(key[1], self.default)
+            idle = now - last
+            if idle >= self.ttl or tokens + idle / period >= burst:
+                del self._buckets[key]
+
+    def stats(self) -> dict:
+        return {
+            "buckets": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": dict(self.rejected),
+            "rejected_total": sum(self.rejected.values()),
+        }
@@ -0,0 +1,92 @@
+import asyncio
+
+from typing import Callable
+
+import discord
+
+# Discord's limit on the value of one embed field
+FIELD_LIMIT = 1024
+# Room kept at the end of each field for the "…and N more" line
+_SUMMARY_ROOM = 24
+ROSTER_FIELD = "Players"
+
+
+class Roster:
+    """Players of one lobby, with debounced edits of its messages.
+
+    Joins and leaves only touch an ordered dict. The mentions are rendered
+    into fields of at most 1024 characters once per edit, however many
+    clicks came in during the delay, and the same embed goes to every lobby
+    message of the game; players beyond 'max_fields' fields are summed up
+    in a count.
+    """
+
+    def __init__(self, template: discord.Embed, players=(), max_fields: int = 4):
+        # Lobby messages by id; a tournament has one per channel
+        self.messages: dict[int, discord.Message | discord.PartialMessage] = {}
+        # The lobby embed without its roster fields
+        self.template = template
+        self.players: dict[str, None] = dict.fromkeys(players)
+        self.max_fields = max_fields
+        self._handle: asyncio.TimerHandle | None = None
+
+    @classmethod
+    def from_message(cls, message: discord.Message, players, max_fields: int = 4) -> "Roster":
+        template = message.embeds[0].copy()
+        for i in reversed(range(len(template.fields))):
+            if template.fields[i].name.startswith(ROSTER_FIELD):
+                template.remove_field(i)
+        roster = cls(template, players, max_fields)
+        roster.attach(message)
+        return roster
+
+    def attach(self, message: discord.Message | discord.PartialMessage) -> None:
+        self.messages.setdefault(message.id, message)
+
+    def add(self, player_id: str) -> None:
+        self.players[player_id] = None
+
+    def remove(self, player_id: str) -> None:
+        self.players.pop(player_id, None)
+
+    def fields(self) -> list[tuple[str, str]]:
+        pages: list[list[str]] = [[]]
+        size = 0
+        for player_id in self.players:
+            mention = f"<@{player_id}>"
+            if size + len(mention) + 1 > FIELD_LIMIT - _SUMMARY_ROOM:
+                if len(pages) == self.max_fields:
+                    break
+                pages.append([])
+                size = 0
+            pages[-1].append(mention)
+            size += len(mention) + 1
+
+        values = ["\n".join(page) for page in pages]
+        hidden = len(self.players) - sum(map(len, pages))
+        if hidden:
+            values[-1] += f"\n…and {hidden} more"
+        names = [f"{ROSTER_FIELD} ({len(self.players)})"]
+        names += [f"{ROSTER_FIELD} (cont.)"] * (len(values) - 1)
+        return list(zip(names, [v or "—" for v in values]))
+
+    def embed(self) -> discord.Embed:
+        embed = self.template.copy()
+        # Right after "Max Players", like the lobby was first sent
+        for i, (name, value) in enumerate(self.fields(), start=1):
+            embed.insert_field_at(i, name=name, value=value, inline=False)
+        return embed
+
+    def schedule(self, delay: float, edit: Callable[["Roster"], None]) -> None:
+        """Calls 'edit' once 'delay' seconds from the first change, folding in every later one."""
+        if self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(delay, self._fire, edit)
+
+    def _fire(self, edit: Callable[["Roster"], None]) -> None:
+        self._handle = None
+        edit(self)
+
+    def cancel(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
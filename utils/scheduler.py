@@ -0,0 +1,157 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+from typing import Awaitable, Callable
+
+
+class _Entry:
+    __slots__ = ("interval", "deadline", "paused", "version")
+
+    def __init__(self, interval: float, deadline: float):
+        self.interval = interval
+        self.deadline = deadline
+        self.paused = False
+        self.version = 0
+
+
+class DrawScheduler:
+    """Drives every game's draws from one task and a deadline heap.
+
+    'tick' is awaited with the game's key whenever it is due and returns
+    False once the game is over. All games due at the same moment are ticked
+    together, and each deadline gets a little random jitter so games started
+    together drift apart instead of hitting Discord in the same instant.
+    """
+
+    def __init__(self, tick: Callable[[str], Awaitable[bool]], jitter: float = 0.0):
+        self.tick = tick
+        self.jitter = jitter
+        self._entries: dict[str, _Entry] = {}
+        # (deadline, key, version); stale versions are skipped when popped
+        self._heap: list[tuple[float, str, int]] = []
+        self._versions = itertools.count(1)
+        self._running: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _push(self, key: str, entry: _Entry) -> None:
+        entry.version = next(self._versions)
+        heapq.heappush(self._heap, (entry.deadline, key, entry.version))
+        self._wakeup.set()
+
+    def _jittered(self, interval: float) -> float:
+        if self.jitter:
+            return max(0.0, interval + random.uniform(-self.jitter, self.jitter))
+        return interval
+
+    def schedule(self, key: str, interval: float, paused: bool = False) -> None:
+        """Starts ticking 'key' every 'interval' seconds, replacing any earlier schedule."""
+        entry = _Entry(interval, time.monotonic() + self._jittered(interval))
+        self._entries[key] = entry
+        entry.paused = paused
+        if not paused:
+            self._push(key, entry)
+
+    def cancel(self, key: str) -> None:
+        # Any heap entry left behind is skipped because its key is gone
+        self._entries.pop(key, None)
+
+    def pause(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is None or entry.paused:
+            return False
+        entry.paused = True
+        entry.version = 0
+        return True
+
+    def resume(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is None or not entry.paused:
+            return False
+        entry.paused = False
+        entry.deadline = time.monotonic() + self._jittered(entry.interval)
+        self._push(key, entry)
+        return True
+
+    def games(self) -> dict[str, dict]:
+        """Every scheduled game with its interval, pause state and seconds until the next draw."""
+        now = time.monotonic()
+        return {
+            key: {
+                "interval": entry.interval,
+                "paused": entry.paused,
+                "next_in": None if entry.paused else max(0.0, entry.deadline - now),
+            }
+            for key, entry in self._entries.items()
+        }
+
+    def _pop_due(self, now: float) -> list[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, key, version = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version and not entry.paused:
+                due.append(key)
+        return due
+
+    async def _tick(self, key: str) -> None:
+        try:
+            keep = await self.tick(key)
+        except Exception as e:
+            print(f"Draw for game {key} failed: {e}")
+            keep = True
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if not keep:
+            self.cancel(key)
+        elif not entry.paused:
+            entry.deadline += self._jittered(entry.interval)
+            # Don't try to catch up on draws missed while the loop was busy
+            entry.deadline = max(entry.deadline, time.monotonic())
+            self._push(key, entry)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            due = self._pop_due(now)
+            if due:
+                # Each tick reschedules itself when done, so a slow edit never delays other games
+                for key in due:
+                    task = asyncio.create_task(self._tick(key))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+                continue
+            # Drop stale entries so the head of the heap is a real deadline
+            while self._heap:
+                _, key, version = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is not None and entry.version == version and not entry.paused:
+                    break
+                heapq.heappop(self._heap)
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
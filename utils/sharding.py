@@ -0,0 +1,150 @@
+"""Multi-process sharding: a supervisor launching one bot process per group of shards.
+
+    python -m utils.sharding
+
+Each worker runs main.py with the shards it owns in its environment. Discord
+routes every guild to shard (guild_id >> 22) % shard_count, so a worker only
+ever sees the games of its own guilds and keeps them in its own partition of
+the game data (see 'partition_path').
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import time
+
+import aiohttp
+
+from . import config
+
+SHARD_IDS_ENV = "BINGO_SHARD_IDS"
+SHARD_COUNT_ENV = "BINGO_SHARD_COUNT"
+WORKER_INDEX_ENV = "BINGO_WORKER_INDEX"
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def shard_of(guild_id: int, shard_count: int) -> int:
+    return (guild_id >> 22) % shard_count
+
+
+def worker_shards() -> tuple[list[int], int, int] | None:
+    """(shard ids, shard count, worker index) when running under the supervisor, else None."""
+    if SHARD_IDS_ENV not in os.environ:
+        return None
+    shard_ids = [int(i) for i in os.environ[SHARD_IDS_ENV].split(",")]
+    return shard_ids, int(os.environ[SHARD_COUNT_ENV]), int(os.environ[WORKER_INDEX_ENV])
+
+
+def partition_name(shard_ids: list[int]) -> str:
+    return "shard-" + "-".join(map(str, shard_ids))
+
+
+def partition_path(path: str, name: str) -> str:
+    """'./bingo_game_data.json' -> './bingo_game_data.shard-0-1.json'"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{name}{ext}"
+
+
+async def fetch_shard_count(token: str) -> int:
+    """The number of shards Discord recommends for the bot."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {token}"},
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())["shards"]
+
+
+class Supervisor:
+    """Keeps one worker process per group of 'per_process' shards running.
+
+    A worker that exits is restarted after an exponential backoff, which is
+    reset once it has stayed up for 'max_backoff' seconds. SIGINT/SIGTERM
+    stop every worker and then the supervisor.
+    """
+
+    def __init__(self, shard_count: int, per_process: int, max_backoff: float = 60.0):
+        self.shard_count = shard_count
+        self.groups = [
+            list(range(start, min(start + per_process, shard_count)))
+            for start in range(0, shard_count, per_process)
+        ]
+        self.max_backoff = max_backoff
+        self._processes: dict[int, asyncio.subprocess.Process] = {}
+        self._stopping = asyncio.Event()
+
+    async def _spawn(self, index: int) -> asyncio.subprocess.Process:
+        env = dict(
+            os.environ,
+            **{
+                SHARD_IDS_ENV: ",".join(map(str, self.groups[index])),
+                SHARD_COUNT_ENV: str(self.shard_count),
+                WORKER_INDEX_ENV: str(index),
+            },
+        )
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, MAIN_PATH, env=env, cwd=os.path.dirname(MAIN_PATH)
+        )
+        self._processes[index] = process
+        print(f"Worker {index} (shards {self.groups[index]}) started as pid {process.pid}")
+        return process
+
+    async def _keep_alive(self, index: int) -> None:
+        failures = 0
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            process = await self._spawn(index)
+            if self._stopping.is_set():
+                # Stopped while this one was being launched
+                process.terminate()
+            code = await process.wait()
+            if self._stopping.is_set():
+                break
+            if time.monotonic() - started >= self.max_backoff:
+                failures = 0
+            delay = min(self.max_backoff, 2**failures)
+            failures += 1
+            print(f"Worker {index} exited with code {code}, restarting in {delay}s")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _terminate(self, timeout: float = 30.0) -> None:
+        running = [p for p in self._processes.values() if p.returncode is None]
+        for process in running:
+            process.terminate()
+        try:
+            await asyncio.wait_for(asyncio.gather(*(p.wait() for p in running)), timeout)
+        except asyncio.TimeoutError:
+            for process in running:
+                if process.returncode is None:
+                    process.kill()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+        workers = [asyncio.create_task(self._keep_alive(i)) for i in range(len(self.groups))]
+        await self._stopping.wait()
+        await self._terminate()
+        await asyncio.gather(*workers)
+
+
+async def supervise() -> None:
+    if config.STORAGE_BACKEND != "sqlite":
+        # Every worker records wins, and only SQLite can share them safely
+        sys.exit('Sharded mode needs STORAGE_BACKEND = "sqlite"')
+    shard_count = config.SHARD_COUNT or await fetch_shard_count(config.TOKEN)
+    print(f"Running {shard_count} shards, {config.SHARDS_PER_PROCESS} per process")
+    await Supervisor(shard_count, config.SHARDS_PER_PROCESS).run()
+
+
+if __name__ == "__main__":
+    asyncio.run(supervise())
@@ -0,0 +1,206 @@
+import json
+import sqlite3
+import sys
+import threading
+
+from . import json_util
+from .models import Game
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    host_id TEXT PRIMARY KEY,
+    max_players INTEGER NOT NULL,
+    started INTEGER NOT NULL DEFAULT 0,
+    numbers_drawn TEXT NOT NULL DEFAULT '[]',
+    channel_id INTEGER,
+    message_id INTEGER,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS players (
+    host_id TEXT NOT NULL REFERENCES games (host_id) ON DELETE CASCADE,
+    player_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (host_id, player_id)
+);
+CREATE TABLE IF NOT EXISTS cards (
+    host_id TEXT NOT NULL REFERENCES games (host_id) ON DELETE CASCADE,
+    player_id TEXT NOT NULL,
+    card TEXT NOT NULL,
+    marks TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (host_id, player_id)
+);
+"""
+
+WINS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wins (
+    user_id TEXT PRIMARY KEY,
+    wins INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS wins_by_count ON wins (wins DESC);
+"""
+
+# Game keys with their own column or table; anything else is kept in 'extra'
+_COLUMNS = {"max_players", "started", "players", "cards", "channel_id", "message_id"}
+
+
+class SqliteBackend:
+    """Game storage and leaderboard in one SQLite database, in WAL mode.
+
+    Flushes only rewrite the games that changed, and leaderboard queries are
+    answered from the index on win counts. With 'leaderboard_path' the wins
+    live in a separate database, which several processes can share.
+    """
+
+    def __init__(self, path: str, leaderboard_path: str | None = None):
+        self.path = path
+        # Used from worker threads, one at a time
+        self._conn = self._connect(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            if leaderboard_path is None or leaderboard_path == path:
+                self._wins = self._conn
+            else:
+                self._wins = self._connect(leaderboard_path)
+            self._wins.executescript(WINS_SCHEMA)
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        # Other processes may hold the write lock for a moment, so wait for it
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def load(self) -> dict:
+        games: dict[str, dict] = {}
+        with self._lock:
+            for host_id, max_players, started, drawn, channel_id, message_id, extra in self._conn.execute(
+                "SELECT host_id, max_players, started, numbers_drawn, channel_id, message_id, extra FROM games"
+            ):
+                game = json.loads(extra)
+                game.update(max_players=max_players, started=bool(started), players=[], cards={})
+                # Only databases written before draws were seeded fill numbers_drawn
+                if drawn != "[]":
+                    game["numbers_drawn"] = json.loads(drawn)
+                if message_id is not None:
+                    game["channel_id"] = channel_id
+                    game["message_id"] = message_id
+                games[host_id] = game
+            for host_id, player_id in self._conn.execute(
+                "SELECT host_id, player_id FROM players ORDER BY host_id, position"
+            ):
+                games[host_id]["players"].append(player_id)
+            for host_id, player_id, card, marks in self._conn.execute(
+                "SELECT host_id, player_id, card, marks FROM cards"
+            ):
+                # Marks are a mask, or a JSON list in older databases
+                games[host_id]["cards"][player_id] = [int(card), json.loads(marks)]
+        return games
+
+    def _insert_game(self, host_id: str, game: dict) -> None:
+        """Inserts a game in the persisted format of models.Game.to_dict."""
+        players = game["players"]
+        extra = {k: v for k, v in game.items() if k not in _COLUMNS}
+        self._conn.execute(
+            "INSERT INTO games (host_id, max_players, started, channel_id, message_id, extra) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                host_id,
+                game["max_players"],
+                int(game["started"]),
+                game.get("channel_id"),
+                game.get("message_id"),
+                json.dumps(extra),
+            ),
+        )
+        self._conn.executemany(
+            "INSERT INTO players (host_id, player_id, position) VALUES (?, ?, ?)",
+            [(host_id, pid, i) for i, pid in enumerate(players)],
+        )
+        self._conn.executemany(
+            "INSERT INTO cards (host_id, player_id, card, marks) VALUES (?, ?, ?, ?)",
+            [
+                (host_id, pid, str(card), str(marks))
+                for pid, (card, marks) in game["cards"].items()
+            ],
+        )
+
+    def write(self, encoded: dict[str, str], changed: set[str]) -> int:
+        """Rewrites only the games in 'changed'; those missing from 'encoded' were deleted.
+
+        Returns the size of the game data written.
+        """
+        written = 0
+        with self._lock, self._conn:
+            for host_id in changed:
+                self._conn.execute("DELETE FROM games WHERE host_id = ?", (host_id,))
+                if host_id in encoded:
+                    self._insert_game(host_id, json.loads(encoded[host_id]))
+                    written += len(encoded[host_id])
+        return written
+
+    def record_win(self, user_id: str):
+        with self._lock, self._wins:
+            self._wins.execute(
+                "INSERT INTO wins (user_id, wins) VALUES (?, 1) ON CONFLICT (user_id) DO UPDATE SET wins = wins + 1",
+                (user_id,),
+            )
+
+    def top_wins(self, limit: int) -> list[tuple[str, int]]:
+        with self._lock:
+            return self._wins.execute(
+                "SELECT user_id, wins FROM wins ORDER BY wins DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def win_rank(self, user_id: str) -> tuple[int, int] | None:
+        """Returns (rank, wins) of a user, or None if they never won."""
+        with self._lock:
+            row = self._wins.execute(
+                "SELECT wins FROM wins WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            (ahead,) = self._wins.execute(
+                "SELECT COUNT(*) FROM wins WHERE wins > ?", row
+            ).fetchone()
+        return ahead + 1, row[0]
+
+    def close(self):
+        with self._lock:
+            if self._wins is not self._conn:
+                self._wins.close()
+            self._conn.close()
+
+
+def import_json(json_path: str, db_path: str, leaderboard_path: str | None = None) -> int:
+    """One-shot import of a bingo_game_data.json file (and optionally a leaderboard file) into SQLite.
+
+    Returns the number of games imported.
+    """
+    games = json_util.load_game_data(json_path)
+    backend = SqliteBackend(db_path)
+    with backend._lock, backend._conn:
+        for host_id, game in games.items():
+            backend._conn.execute("DELETE FROM games WHERE host_id = ?", (host_id,))
+            # Whatever format the file is in, import it in the current one
+            backend._insert_game(host_id, Game.from_dict(game, host_id).to_dict())
+        if leaderboard_path:
+            with open(leaderboard_path, encoding="utf-8") as f:
+                wins = json.load(f)
+            backend._wins.executemany(
+                "INSERT INTO wins (user_id, wins) VALUES (?, ?) ON CONFLICT (user_id) DO UPDATE SET wins = excluded.wins",
+                wins.items(),
+            )
+    backend.close()
+    return len(games)
+
+
+if __name__ == "__main__":
+    # python -m utils.sqlite_util <bingo_game_data.json> <bingo.db> [leaderboard.json]
+    if len(sys.argv) not in (3, 4):
+        sys.exit(
+            "usage: python -m utils.sqlite_util <game_data.json> <database.db> [leaderboard.json]"
+        )
+    count = import_json(*sys.argv[1:])
+    print(f"Imported {count} games into {sys.argv[2]}")
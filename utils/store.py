@@ -0,0 +1,384 @@
+import asyncio
+import sqlite3
+import time
+
+from . import bingo, models
+from .journal import Journal
+from .models import Game, PlayerCard, Snapshot
+
+
+class GameStore:
+    """In-memory source of truth for every game, flushed to disk in the background.
+
+    Every change goes through one of the event methods below, which apply the
+    change and append it to the journal. Events are idempotent, so replaying
+    the journal on top of a snapshot that already contains some of them is safe.
+    """
+
+    def __init__(
+        self,
+        backend,
+        flush_interval: float,
+        journal: Journal | None = None,
+        compact_bytes: int = 1_000_000,
+    ):
+        # json_util.JsonBackend or sqlite_util.SqliteBackend
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.journal = journal
+        self.compact_bytes = compact_bytes
+        self._games: dict[str, Game] = {}
+        # Runtime-only win indexes of started games, rebuilt on load
+        self._indexes: dict[str, bingo.WinIndex] = {}
+        # Win indexes built ahead by start_game, picked up by its event
+        self._prebuilt: dict[str, bingo.WinIndex] = {}
+        # Claim verdicts of started games as of their latest draw
+        self._snapshots: dict[str, Snapshot] = {}
+        # Board and lobby message id -> host id
+        self._by_message: dict[int, str] = {}
+        # Pre-encoded JSON per game, so a flush only re-encodes the dirty ones
+        self._encoded: dict[str, str] = {}
+        self._dirty: set[str] = set()
+        # Set when a write failed, so the next flush retries even if nothing changed
+        self._stale = False
+        # Games changed since the last successful write
+        self._unwritten: set[str] = set()
+        # Storage I/O counters
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.load_bytes = 0
+        self.writes = 0
+        self.write_seconds = 0.0
+        self.write_bytes = 0
+        self._flush_task: asyncio.Task | None = None
+
+    def __contains__(self, host_id: str) -> bool:
+        return host_id in self._games
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def get(self, host_id: str) -> Game | None:
+        return self._games.get(host_id)
+
+    def items(self):
+        return self._games.items()
+
+    def player_count(self) -> int:
+        return sum(len(game.players) for game in self._games.values())
+
+    def drawn(self, host_id: str) -> tuple[int, ...]:
+        """The numbers a game has called so far, in order."""
+        return self._games[host_id].drawn()
+
+    def load(self) -> None:
+        """Replaces the in-memory state with whatever is on disk, journal included."""
+        start = time.perf_counter()
+        saved = self.backend.load()
+        self.load_seconds += time.perf_counter() - start
+        self.loads += 1
+        self._games = {k: Game.from_dict(v, k) for k, v in saved.items()}
+        self._encoded = {k: models.encode(v) for k, v in self._games.items()}
+        self.load_bytes += sum(map(len, self._encoded.values()))
+        # Games saved in an older format are rewritten in the current one
+        self._dirty = {k for k, v in saved.items() if not models.is_current(v)}
+        self._indexes.clear()
+        self._snapshots.clear()
+        self._by_message.clear()
+        for host_id, game in self._games.items():
+            if game.started:
+                self._build_index(host_id, game)
+            self._index_messages(host_id, game)
+        if self.journal is not None:
+            for event in self.journal.replay():
+                self._apply(event)
+
+    def _build_index(self, host_id: str, game: Game) -> None:
+        index = self._prebuilt.pop(host_id, None)
+        if index is None:
+            index = bingo.WinIndex(
+                {pid: player.card for pid, player in game.cards.items()},
+                bingo.card_mask(game.drawn()),
+                game.patterns,
+            )
+        self._indexes[host_id] = index
+        self._snapshots.pop(host_id, None)
+        self._publish(host_id, game)
+
+    def _publish(self, host_id: str, game: Game) -> None:
+        index = self._indexes[host_id]
+        previous = self._snapshots.get(host_id)
+        if previous is None:
+            self._snapshots[host_id] = Snapshot(
+                game.draws, frozenset(game.cards), frozenset(index.winners)
+            )
+            return
+        # Cards never change once dealt and winners only ever get added, so
+        # most draws reuse both sets
+        winners = previous.winners
+        if len(winners) != len(index.winners):
+            winners = frozenset(index.winners)
+        self._snapshots[host_id] = Snapshot(game.draws, previous.players, winners)
+
+    def snapshot(self, host_id: str) -> Snapshot | None:
+        """Claim verdicts of a started game as of its latest draw; safe to read without the lock."""
+        return self._snapshots.get(host_id)
+
+    def _index_messages(self, host_id: str, game: Game) -> None:
+        if game.message_id is not None:
+            self._by_message[game.message_id] = host_id
+        for _, message_id in game.lobbies + game.mirrors:
+            self._by_message[message_id] = host_id
+
+    def host_of_message(self, message_id: int) -> str | None:
+        """Host id of the game whose number board or lobby is 'message_id'."""
+        return self._by_message.get(message_id)
+
+    # Events
+
+    def _record(self, event: dict) -> None:
+        self._apply(event)
+        if self.journal is not None:
+            self.journal.append(event)
+
+    def _apply(self, event: dict) -> None:
+        host_id = event["host"]
+        kind = event["e"]
+        if kind == "created":
+            game = self._games[host_id] = Game(
+                event["max_players"],
+                event.get("draw_interval"),
+                # Journals written before draws were seeded have no seed
+                event["seed"] if "seed" in event else bingo.derived_seed(host_id),
+                tuple(event.get("patterns", (bingo.BLACKOUT,))),
+            )
+            game.guild_id = event.get("guild")
+            game.players.append(host_id)
+        elif kind == "deleted":
+            game = self._games.pop(host_id, None)
+            if game is not None:
+                for message_id in [game.message_id] + [m for _, m in game.lobbies + game.mirrors]:
+                    self._by_message.pop(message_id, None)
+            self._encoded.pop(host_id, None)
+            self._indexes.pop(host_id, None)
+            self._snapshots.pop(host_id, None)
+        else:
+            game = self._games.get(host_id)
+            if game is None:
+                return
+            if kind == "joined":
+                if event["player"] not in game.players:
+                    game.players.append(event["player"])
+            elif kind == "left":
+                if event["player"] in game.players:
+                    game.players.remove(event["player"])
+            elif kind == "started":
+                game.started = True
+                for pid, card in event["cards"].items():
+                    game.cards[pid] = PlayerCard(card)
+                self._build_index(host_id, game)
+            elif kind == "board":
+                game.channel_id = event["channel"]
+                game.message_id = event["message"]
+                self._by_message[event["message"]] = host_id
+            elif kind in ("lobby", "mirror"):
+                entries = game.lobbies if kind == "lobby" else game.mirrors
+                entry = [event["channel"], event["message"]]
+                if entry not in entries:
+                    entries.append(entry)
+                self._by_message[event["message"]] = host_id
+            elif kind == "drawn":
+                if "number" in event:
+                    # Journals written before draws were seeded name the number instead
+                    if event["number"] in game.drawn():
+                        return
+                    game.legacy_draws += (event["number"],)
+                    new = [event["number"]]
+                    game.draws += 1
+                else:
+                    new = game.order()[game.draws : event["draws"]]
+                    game.draws = max(game.draws, event["draws"])
+                index = self._indexes.get(host_id)
+                if index is not None:
+                    for number in new:
+                        index.draw(number)
+                    self._publish(host_id, game)
+            elif kind == "marked":
+                player = game.cards.get(event["player"])
+                if player is None:
+                    return
+                bit = 1 << (event["number"] - 1)
+                if event["marked"]:
+                    player.marks |= bit
+                else:
+                    player.marks &= ~bit
+            elif kind == "paused":
+                game.paused = event["paused"]
+            elif kind == "winner":
+                game.winner = event["player"]
+        self._dirty.add(host_id)
+
+    def create(
+        self,
+        host_id: str,
+        max_players: int,
+        draw_interval: float,
+        patterns: tuple[int, ...] = (bingo.BLACKOUT,),
+        guild_id: int | None = None,
+    ) -> Game:
+        self._record(
+            {
+                "e": "created",
+                "host": host_id,
+                "max_players": max_players,
+                "draw_interval": draw_interval,
+                "seed": bingo.new_seed(),
+                "patterns": list(patterns),
+                "guild": guild_id,
+            }
+        )
+        return self._games[host_id]
+
+    def delete(self, host_id: str) -> Game | None:
+        game = self._games.get(host_id)
+        if game is not None:
+            self._record({"e": "deleted", "host": host_id})
+        return game
+
+    def add_player(self, host_id: str, player_id: str) -> None:
+        self._record({"e": "joined", "host": host_id, "player": player_id})
+
+    def remove_player(self, host_id: str, player_id: str) -> None:
+        self._record({"e": "left", "host": host_id, "player": player_id})
+
+    def start_game(
+        self, host_id: str, cards: dict[str, int], index: bingo.WinIndex | None = None
+    ) -> None:
+        """Starts a game with one card mask per player.
+
+        'index' is a WinIndex of the cards with nothing drawn yet, built
+        ahead (e.g. in a thread) so the game starts without building one.
+        """
+        if index is not None:
+            self._prebuilt[host_id] = index
+        self._record({"e": "started", "host": host_id, "cards": cards})
+
+    def set_board(self, host_id: str, channel_id: int, message_id: int) -> None:
+        """Remembers where the game's number board lives, so it can be resumed."""
+        self._record(
+            {"e": "board", "host": host_id, "channel": channel_id, "message": message_id}
+        )
+
+    def add_lobby(self, host_id: str, channel_id: int, message_id: int) -> None:
+        """Remembers a lobby message of the game; the game is played in every lobby's channel."""
+        self._record(
+            {"e": "lobby", "host": host_id, "channel": channel_id, "message": message_id}
+        )
+
+    def add_mirror(self, host_id: str, channel_id: int, message_id: int) -> None:
+        """Remembers a copy of the number board in another lobby's channel."""
+        self._record(
+            {"e": "mirror", "host": host_id, "channel": channel_id, "message": message_id}
+        )
+
+    def draw(self, host_id: str) -> int | None:
+        """Draws the game's next number and returns it, or None once all are out.
+
+        The win index counts the number as the event is applied, and the new
+        winners show up in the game's next snapshot.
+        """
+        game = self._games.get(host_id)
+        if game is None or game.draws >= 75:
+            return None
+        number = game.order()[game.draws]
+        self._record({"e": "drawn", "host": host_id, "draws": game.draws + 1})
+        return number
+
+    def set_mark(self, host_id: str, player_id: str, number: int, marked: bool) -> None:
+        self._record(
+            {
+                "e": "marked",
+                "host": host_id,
+                "player": player_id,
+                "number": number,
+                "marked": marked,
+            }
+        )
+
+    def set_paused(self, host_id: str, paused: bool) -> None:
+        self._record({"e": "paused", "host": host_id, "paused": paused})
+
+    def set_winner(self, host_id: str, player_id: str) -> None:
+        self._record({"e": "winner", "host": host_id, "player": player_id})
+
+    # Persistence
+
+    def _snapshot(self) -> tuple[dict[str, str], set[str]] | None:
+        """Encodes the dirty games; returns every encoded game plus the ids that changed."""
+        if not self._dirty and not self._stale:
+            return None
+        for host_id in self._dirty:
+            game = self._games.get(host_id)
+            if game is not None:
+                self._encoded[host_id] = models.encode(game)
+        changed = self._dirty | self._unwritten
+        self._unwritten = changed
+        self._dirty = set()
+        self._stale = True
+        return {k: self._encoded[k] for k in self._games}, changed
+
+    def _compact_journal(self) -> None:
+        # Called right after a snapshot, so the rotated log holds only events it covers
+        if self.journal is not None and self.journal.size() >= self.compact_bytes:
+            self.journal.rotate()
+
+    def _write(self, encoded: dict[str, str], changed: set[str]) -> None:
+        # Runs in a worker thread; only touches the counters once the write is done
+        start = time.perf_counter()
+        written = self.backend.write(encoded, changed)
+        self.write_seconds += time.perf_counter() - start
+        self.write_bytes += written
+        self.writes += 1
+
+    def _snapshot_written(self) -> None:
+        self._stale = False
+        self._unwritten = set()
+        if self.journal is not None:
+            self.journal.discard_rotated()
+
+    async def flush(self) -> None:
+        """Writes the current state to disk if anything changed since the last flush."""
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return
+        self._compact_journal()
+        await asyncio.to_thread(self._write, *snapshot)
+        self._snapshot_written()
+
+    def flush_sync(self) -> None:
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return
+        self._compact_journal()
+        self._write(*snapshot)
+        self._snapshot_written()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except (OSError, sqlite3.Error) as e:
+                # The snapshot stays stale, so the next flush retries the write
+                print(f"Failed to flush game data: {e}")
+
+    def start(self) -> None:
+        """Starts flushing in the background; must be called from a running event loop."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()